@@ -11,6 +11,7 @@ from lotus.sem_ops import (
     sem_extract,
     sem_filter,
     sem_index,
+    sem_flush,
     sem_join,
     sem_map,
     sem_partition_by,
@@ -36,6 +37,7 @@ __all__ = [
     "sem_partition_by",
     "sem_topk",
     "sem_index",
+    "sem_flush",
     "load_sem_index",
     "sem_sim_join",
     "sem_cluster_by",
@@ -1,11 +1,12 @@
+import atexit
 import copy
 import hashlib
-import json
 import os
 import pickle
 import sqlite3
 import threading
 import time
+import weakref
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from enum import Enum
@@ -13,9 +14,24 @@ from functools import wraps
 from typing import Any, Callable
 
 import pandas as pd
+from litellm.types.utils import ModelResponse
 
 import lotus
 
+try:
+    import xxhash
+
+    xxhash_available = True
+except ImportError:
+    xxhash_available = False
+
+try:
+    import lmdb
+
+    lmdb_available = True
+except ImportError:
+    lmdb_available = False
+
 
 def require_cache_enabled(func: Callable) -> Callable:
     """Decorator to check if caching is enabled before calling the function."""
@@ -29,6 +45,82 @@ def require_cache_enabled(func: Callable) -> Callable:
     return wrapper
 
 
+def new_hasher() -> Any:
+    """
+    Create an incremental hasher for cache keys.
+    Uses xxh3_128 when xxhash is installed and falls back to SHA-256 otherwise. The keys are
+    not security sensitive, so SHA-256 is requested with usedforsecurity=False.
+    """
+    if xxhash_available:
+        return xxhash.xxh3_128()
+    return hashlib.sha256(usedforsecurity=False)
+
+
+def _update_hash(hasher: Any, value: Any) -> None:
+    """
+    Feed a canonical byte encoding of a value into the hasher.
+    Supports basic types, pandas DataFrames, and objects with a `dict` or `__dict__` method.
+    Every value is prefixed with a type tag and strings with their length so that distinct
+    values never produce the same byte stream.
+    """
+    if value is None:
+        hasher.update(b"N")
+    elif isinstance(value, bool):
+        hasher.update(b"T" if value else b"F")
+    elif isinstance(value, (int, float)):
+        hasher.update(b"n")
+        hasher.update(repr(value).encode())
+        hasher.update(b"\x00")
+    elif isinstance(value, str):
+        encoded = value.encode()
+        hasher.update(b"s%d:" % len(encoded))
+        hasher.update(encoded)
+    elif isinstance(value, pd.DataFrame):
+        hasher.update(b"D")
+        # Row hashes ignore labels and dtypes, so feed those separately
+        _update_hash(hasher, [str(col) for col in value.columns])
+        _update_hash(hasher, [str(dtype) for dtype in value.dtypes])
+        # hash_pandas_object hashes object columns as strings, so 1 and "1" collide; feed the
+        # inferred type of each object column and fall back to JSON when a column mixes types
+        inferred = [
+            pd.api.types.infer_dtype(value.iloc[:, i], skipna=True) if pd.api.types.is_object_dtype(dtype) else ""
+            for i, dtype in enumerate(value.dtypes)
+        ]
+        _update_hash(hasher, inferred)
+        row_hashes = None
+        if not any(kind.startswith("mixed") for kind in inferred):
+            try:
+                row_hashes = pd.util.hash_pandas_object(value, index=True).values
+            except TypeError:
+                # Columns holding unhashable objects such as lists or dicts
+                pass
+        if row_hashes is not None:
+            hasher.update(row_hashes.tobytes())
+        else:
+            encoded = value.to_json(orient="split").encode()
+            hasher.update(b"%d:" % len(encoded))
+            hasher.update(encoded)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"[")
+        for item in value:
+            _update_hash(hasher, item)
+        hasher.update(b"]")
+    elif isinstance(value, dict):
+        hasher.update(b"{")
+        for key, val in value.items():
+            _update_hash(hasher, str(key))
+            _update_hash(hasher, val)
+        hasher.update(b"}")
+    elif hasattr(value, "dict"):
+        _update_hash(hasher, value.dict())
+    elif hasattr(value, "__dict__"):
+        _update_hash(hasher, {key: val for key, val in vars(value).items() if not key.startswith("_")})
+    else:
+        # For unsupported types, convert to string (last resort)
+        lotus.logger.warning(f"Unsupported type {type(value)} for serialization. Converting to string.")
+        _update_hash(hasher, str(value))
+
+
 def operator_cache(func: Callable) -> Callable:
     """Decorator to add operator level caching."""
 
@@ -38,37 +130,14 @@ def operator_cache(func: Callable) -> Callable:
         use_operator_cache = lotus.settings.enable_cache
 
         if use_operator_cache and model.cache:
-
-            def serialize(value: Any) -> Any:
-                """
-                Serialize a value into a JSON-serializable format.
-                Supports basic types, pandas DataFrames, and objects with a `dict` or `__dict__` method.
-                """
-                if value is None or isinstance(value, (str, int, float, bool)):
-                    return value
-                elif isinstance(value, pd.DataFrame):
-                    return value.to_json(orient="split")
-                elif isinstance(value, (list, tuple)):
-                    return [serialize(item) for item in value]
-                elif isinstance(value, dict):
-                    return {key: serialize(val) for key, val in value.items()}
-                elif hasattr(value, "dict"):
-                    return value.dict()
-                elif hasattr(value, "__dict__"):
-                    return {key: serialize(val) for key, val in vars(value).items() if not key.startswith("_")}
-                else:
-                    # For unsupported types, convert to string (last resort)
-                    lotus.logger.warning(f"Unsupported type {type(value)} for serialization. Converting to string.")
-                    return str(value)
-
-            serialize_self = serialize(self._obj)
-            serialized_kwargs = {key: serialize(value) for key, value in kwargs.items()}
-            serialized_args = [serialize(arg) for arg in args]
-            cache_key = hashlib.sha256(
-                json.dumps(
-                    {"self": serialize_self, "args": serialized_args, "kwargs": serialized_kwargs}, sort_keys=True
-                ).encode()
-            ).hexdigest()
+            hasher = new_hasher()
+            hasher.update(b"self")
+            _update_hash(hasher, self._obj)
+            hasher.update(b"args")
+            _update_hash(hasher, args)
+            hasher.update(b"kwargs")
+            _update_hash(hasher, kwargs)
+            cache_key = hasher.hexdigest()
             virtual_usage_cache_key = cache_key + "_usage"
 
             cached_result = model.cache.get(cache_key)
@@ -83,9 +152,9 @@ def operator_cache(func: Callable) -> Callable:
                 return cached_result
             lotus.logger.debug(f"Cache miss for {cache_key}")
 
-            virtual_usage_before = copy.deepcopy(lotus.settings.lm.stats.virtual_usage)
+            virtual_usage_before = copy.deepcopy(model.stats.virtual_usage)
             result = func(self, *args, **kwargs)
-            virtual_usage = lotus.settings.lm.stats.virtual_usage - virtual_usage_before
+            virtual_usage = model.stats.virtual_usage - virtual_usage_before
             model.cache.insert(virtual_usage_cache_key, virtual_usage)
             model.cache.insert(cache_key, result)
             return result
@@ -98,6 +167,7 @@ def operator_cache(func: Callable) -> Callable:
 class CacheType(Enum):
     IN_MEMORY = "in_memory"
     SQLITE = "sqlite"
+    LMDB = "lmdb"
 
 
 class CacheConfig:
@@ -115,6 +185,11 @@ class Cache(ABC):
     def get(self, key: str) -> Any | None:
         pass
 
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Look up several keys at once. Keys that are not cached are omitted from the result."""
+        pass
+
     @abstractmethod
     def insert(self, key: str, value: Any):
         pass
@@ -133,7 +208,22 @@ class CacheFactory:
             cache_dir = config.kwargs.get("cache_dir", os.path.expanduser("~/.lotus/cache"))
             if not isinstance(cache_dir, str):
                 raise ValueError("cache_dir must be a string")
-            return SQLiteCache(max_size=config.max_size, cache_dir=cache_dir)
+            return SQLiteCache(
+                max_size=config.max_size,
+                cache_dir=cache_dir,
+                eviction_interval=config.kwargs.get("eviction_interval", 32),
+                access_flush_interval=config.kwargs.get("access_flush_interval", 64),
+            )
+        elif config.cache_type == CacheType.LMDB:
+            cache_dir = config.kwargs.get("cache_dir", os.path.expanduser("~/.lotus/cache"))
+            if not isinstance(cache_dir, str):
+                raise ValueError("cache_dir must be a string")
+            return LMDBCache(
+                max_size=config.max_size,
+                cache_dir=cache_dir,
+                map_size=config.kwargs.get("map_size", 2**30),
+                access_flush_interval=config.kwargs.get("access_flush_interval", 64),
+            )
         else:
             raise ValueError(f"Unsupported cache type: {config.cache_type}")
 
@@ -142,6 +232,17 @@ class CacheFactory:
         return CacheFactory.create_cache(CacheConfig(CacheType.IN_MEMORY, max_size))
 
 
+# WAL lets readers proceed while a writer commits, and synchronous=NORMAL drops the
+# per-commit fsync (durability is still guaranteed at checkpoint time).
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+"""
+
+
 class ThreadLocalConnection:
     """Wrapper that automatically closes connection when thread dies"""
 
@@ -152,7 +253,9 @@ class ThreadLocalConnection:
     @property
     def connection(self) -> sqlite3.Connection:
         if self._conn is None:
-            self._conn = sqlite3.connect(self._db_path)
+            # Other processes may hold the write lock, so wait longer than the 5s default
+            self._conn = sqlite3.connect(self._db_path, timeout=30, cached_statements=256)
+            self._conn.executescript(SQLITE_PRAGMAS)
         return self._conn
 
     def __del__(self):
@@ -160,13 +263,54 @@ class ThreadLocalConnection:
             self._conn.close()
 
 
+def _flush_at_exit(cache_ref: "weakref.ref[SQLiteCache]") -> None:
+    cache = cache_ref()
+    if cache is not None:
+        try:
+            cache.flush()
+        except sqlite3.Error as e:
+            lotus.logger.debug(f"Could not flush cache accesses at exit: {e}")
+
+
 class SQLiteCache(Cache):
-    def __init__(self, max_size: int, cache_dir=os.path.expanduser("~/.lotus/cache")):
+    MAX_QUERY_PARAMS = 500
+
+    # Encodings recorded in the version column of each row
+    PICKLE_VERSION = 0
+    MODEL_RESPONSE_JSON_VERSION = 1
+
+    def __init__(
+        self,
+        max_size: int,
+        cache_dir=os.path.expanduser("~/.lotus/cache"),
+        eviction_interval: int = 32,
+        access_flush_interval: int = 64,
+    ):
+        """
+        Args:
+            max_size (int): Maximum number of entries to keep in the cache.
+            cache_dir (str): Directory holding the SQLite database file.
+            eviction_interval (int): Number of inserts between size limit checks. The cache may
+                temporarily hold up to eviction_interval - 1 entries over max_size.
+            access_flush_interval (int): Number of cache hits buffered in memory before their
+                recency is written back to the database in one batch.
+        """
         super().__init__(max_size)
         self.db_path = os.path.join(cache_dir, "lotus_cache.db")
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.eviction_interval = max(1, eviction_interval)
+        self.access_flush_interval = max(1, access_flush_interval)
+        self._inserts_since_eviction = 0
+        # Keys read since the last flush, least recently read first
+        self._pending_accesses: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        # Each thread reads through its own connection; writes are serialized in-process so that
+        # threads queue on a lock instead of spinning on SQLITE_BUSY
+        self._write_lock = threading.Lock()
         self._local = threading.local()
         self._create_table()
+        # Don't lose buffered accesses when the interpreter exits without an explicit close()
+        atexit.register(_flush_at_exit, weakref.ref(self))
 
     def _get_connection(self) -> sqlite3.Connection:
         if not hasattr(self._local, "conn_wrapper"):
@@ -179,45 +323,115 @@ class SQLiteCache(Cache):
                 CREATE TABLE IF NOT EXISTS cache (
                     key TEXT PRIMARY KEY,
                     value BLOB,
-                    last_accessed INTEGER
+                    last_accessed INTEGER,
+                    access_seq INTEGER DEFAULT 0,
+                    version INTEGER DEFAULT 0
                 )
             """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+            if "access_seq" not in columns:
+                # Databases created before access_seq existed keep their recency ordering
+                conn.execute("ALTER TABLE cache ADD COLUMN access_seq INTEGER DEFAULT 0")
+                conn.execute("UPDATE cache SET access_seq = COALESCE(last_accessed, 0)")
+            if "version" not in columns:
+                # Rows written before the version column existed are all pickled
+                conn.execute(f"ALTER TABLE cache ADD COLUMN version INTEGER DEFAULT {self.PICKLE_VERSION}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_access_seq ON cache (access_seq, key)")
 
     def _get_time(self):
         return int(time.time())
 
+    def _encode(self, value: Any) -> tuple[bytes, int]:
+        # LLM responses go through pydantic-core, which is faster and more compact than pickle
+        if isinstance(value, ModelResponse):
+            return value.model_dump_json(warnings=False).encode(), self.MODEL_RESPONSE_JSON_VERSION
+        return pickle.dumps(value), self.PICKLE_VERSION
+
+    def _decode(self, blob: bytes, version: int) -> Any:
+        if version == self.MODEL_RESPONSE_JSON_VERSION:
+            return ModelResponse.model_validate_json(blob)
+        return pickle.loads(blob)
+
     def get(self, key: str) -> Any | None:
-        with self._get_connection() as conn:
-            cursor = conn.execute("SELECT value FROM cache WHERE key = ?", (key,))
-            result = cursor.fetchone()
-            if result:
-                lotus.logger.debug(f"Cache hit for {key}")
-                value = pickle.loads(result[0])
-                conn.execute(
-                    "UPDATE cache SET last_accessed = ? WHERE key = ?",
-                    (
-                        self._get_time(),
-                        key,
-                    ),
-                )
-                return value
-            cursor.close()
-        return None
+        result = self._get_connection().execute("SELECT value, version FROM cache WHERE key = ?", (key,)).fetchone()
+        if result is None:
+            return None
+
+        lotus.logger.debug(f"Cache hit for {key}")
+        self._record_accesses([key])
+        return self._decode(result[0], result[1])
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        conn = self._get_connection()
+        unique_keys = list(dict.fromkeys(keys))
+        rows = []
+        # Stay below SQLite's bound parameter limit
+        for i in range(0, len(unique_keys), self.MAX_QUERY_PARAMS):
+            chunk = unique_keys[i : i + self.MAX_QUERY_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(
+                conn.execute(f"SELECT key, value, version FROM cache WHERE key IN ({placeholders})", chunk).fetchall()
+            )
+
+        if rows:
+            lotus.logger.debug(f"Cache hits for {len(rows)} of {len(unique_keys)} keys")
+            self._record_accesses([key for key, _, _ in rows])
+        return {key: self._decode(value, version) for key, value, version in rows}
+
+    def _record_accesses(self, keys: list[str]):
+        with self._lock:
+            for key in keys:
+                self._pending_accesses[key] = None
+                self._pending_accesses.move_to_end(key)
+            should_flush = len(self._pending_accesses) >= self.access_flush_interval
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Write buffered access recency to the database."""
+        with self._lock:
+            if not self._pending_accesses:
+                return
+            keys = [(key,) for key in self._pending_accesses]
+            self._pending_accesses.clear()
+        # Sequence numbers are assigned inside the write transaction, so that processes sharing the
+        # database draw from the same sequence
+        with self._write_lock, self._get_connection() as conn:
+            conn.executemany(
+                "UPDATE cache SET access_seq = (SELECT COALESCE(MAX(access_seq), 0) + 1 FROM cache) WHERE key = ?",
+                keys,
+            )
+
+    def close(self):
+        """Write buffered access recency to the database. The cache can still be used afterwards."""
+        self.flush()
 
     def insert(self, key: str, value: Any):
-        pickled_value = pickle.dumps(value)
-        with self._get_connection() as conn:
+        encoded_value, version = self._encode(value)
+        with self._lock:
+            self._pending_accesses.pop(key, None)
+        with self._write_lock, self._get_connection() as conn:
             conn.execute(
                 """
-                INSERT OR REPLACE INTO cache (key, value, last_accessed) 
-                VALUES (?, ?, ?)
+                INSERT OR REPLACE INTO cache (key, value, last_accessed, access_seq, version)
+                VALUES (?, ?, ?, (SELECT COALESCE(MAX(access_seq), 0) + 1 FROM cache), ?)
             """,
-                (key, pickled_value, self._get_time()),
+                (key, encoded_value, self._get_time(), version),
             )
+
+        # Amortize the COUNT(*) scan over several inserts instead of paying it on every write
+        with self._lock:
+            self._inserts_since_eviction += 1
+            should_evict = self._inserts_since_eviction >= self.eviction_interval
+            if should_evict:
+                self._inserts_since_eviction = 0
+        if should_evict:
             self._enforce_size_limit()
 
     def _enforce_size_limit(self):
-        with self._get_connection() as conn:
+        # Eviction must see the latest recency of every key
+        self.flush()
+        with self._write_lock, self._get_connection() as conn:
             count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
             if count > self.max_size:
                 num_to_delete = count - self.max_size
@@ -225,7 +439,7 @@ class SQLiteCache(Cache):
                     """
                     DELETE FROM cache WHERE key IN (
                         SELECT key FROM cache
-                        ORDER BY last_accessed ASC
+                        ORDER BY access_seq ASC
                         LIMIT ?
                     )
                 """,
@@ -233,8 +447,11 @@ class SQLiteCache(Cache):
                 )
 
     def reset(self, max_size: int | None = None):
-        with self._get_connection() as conn:
+        with self._write_lock, self._get_connection() as conn:
             conn.execute("DELETE FROM cache")
+        with self._lock:
+            self._inserts_since_eviction = 0
+            self._pending_accesses.clear()
         if max_size is not None:
             self.max_size = max_size
 
@@ -247,11 +464,21 @@ class InMemoryCache(Cache):
     def get(self, key: str) -> Any | None:
         if key in self.cache:
             lotus.logger.debug(f"Cache hit for {key}")
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        return None
 
-        return self.cache.get(key)
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        result = {}
+        for key in keys:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                result[key] = self.cache[key]
+        return result
 
     def insert(self, key: str, value: Any):
         self.cache[key] = value
+        self.cache.move_to_end(key)
 
         # LRU eviction
         if len(self.cache) > self.max_size:
@@ -261,3 +488,155 @@ class InMemoryCache(Cache):
         self.cache.clear()
         if max_size is not None:
             self.max_size = max_size
+
+
+# LMDB allows an environment to be opened only once per process, so everything pointing at the
+# same directory shares one handle
+_lmdb_envs: dict[str, Any] = {}
+_lmdb_envs_lock = threading.Lock()
+
+
+def open_lmdb_env(path: str, **kwargs: Any) -> Any:
+    """Open the LMDB environment at `path`, reusing the handle if this process already opened it."""
+    if not lmdb_available:
+        raise ImportError("Please install lmdb using `pip install lotus-ai[lmdb]`")
+
+    path = os.path.realpath(path)
+    with _lmdb_envs_lock:
+        if path not in _lmdb_envs:
+            os.makedirs(path, exist_ok=True)
+            _lmdb_envs[path] = lmdb.open(path, **kwargs)
+        return _lmdb_envs[path]
+
+
+class LMDBCache(Cache):
+    """
+    Cache backed by a memory-mapped LMDB environment that several processes can share.
+
+    Values live in a `values` database. Recency is tracked in two sidecar databases: `seqs`
+    (key -> access sequence) and `order` (access sequence -> key), which keeps the least
+    recently used entry at the front of `order`. As in SQLiteCache, reads only record the
+    access in memory and recency is written back in batches.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        cache_dir=os.path.expanduser("~/.lotus/cache"),
+        map_size: int = 2**30,
+        access_flush_interval: int = 64,
+    ):
+        """
+        Args:
+            max_size (int): Maximum number of entries to keep in the cache.
+            cache_dir (str): Directory holding the LMDB environment.
+            map_size (int): Maximum size of the memory map in bytes.
+            access_flush_interval (int): Number of cache hits buffered in memory before their
+                recency is written back in one transaction.
+        """
+        if not lmdb_available:
+            raise ImportError("Please install lmdb using `pip install lotus-ai[lmdb]`")
+
+        super().__init__(max_size)
+        self.db_path = os.path.join(cache_dir, "lotus_cache.lmdb")
+        os.makedirs(self.db_path, exist_ok=True)
+        self.access_flush_interval = max(1, access_flush_interval)
+        self._pending_accesses: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.env = open_lmdb_env(self.db_path, map_size=map_size, max_dbs=3)
+        self._values_db = self.env.open_db(b"values")
+        self._seqs_db = self.env.open_db(b"seqs")
+        self._order_db = self.env.open_db(b"order")
+
+    @staticmethod
+    def _encode_seq(seq: int) -> bytes:
+        # Big-endian so that LMDB's lexicographic key order matches numeric order
+        return seq.to_bytes(8, "big")
+
+    def _touch(self, txn: Any, key: bytes) -> None:
+        """Move a key to the most recently used end of the order database."""
+        old_seq = txn.get(key, db=self._seqs_db)
+        if old_seq is not None:
+            txn.delete(old_seq, db=self._order_db)
+        cursor = txn.cursor(db=self._order_db)
+        next_seq = int.from_bytes(cursor.key(), "big") + 1 if cursor.last() else 0
+        new_seq = self._encode_seq(next_seq)
+        txn.put(key, new_seq, db=self._seqs_db)
+        txn.put(new_seq, key, db=self._order_db)
+
+    def get(self, key: str) -> Any | None:
+        with self.env.begin(db=self._values_db) as txn:
+            value = txn.get(key.encode())
+        if value is None:
+            return None
+
+        lotus.logger.debug(f"Cache hit for {key}")
+        self._record_accesses([key])
+        return pickle.loads(value)
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        result = {}
+        with self.env.begin(db=self._values_db) as txn:
+            for key in keys:
+                value = txn.get(key.encode())
+                if value is not None:
+                    result[key] = pickle.loads(value)
+
+        if result:
+            lotus.logger.debug(f"Cache hits for {len(result)} of {len(keys)} keys")
+            self._record_accesses(list(result))
+        return result
+
+    def _record_accesses(self, keys: list[str]):
+        with self._lock:
+            for key in keys:
+                self._pending_accesses[key] = None
+                self._pending_accesses.move_to_end(key)
+            should_flush = len(self._pending_accesses) >= self.access_flush_interval
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Write buffered access recency to the database."""
+        with self._lock:
+            if not self._pending_accesses:
+                return
+            keys = list(self._pending_accesses)
+            self._pending_accesses.clear()
+        with self.env.begin(write=True) as txn:
+            for key in keys:
+                encoded_key = key.encode()
+                # The entry may have been evicted since it was read
+                if txn.get(encoded_key, db=self._values_db) is not None:
+                    self._touch(txn, encoded_key)
+
+    def insert(self, key: str, value: Any):
+        encoded_key = key.encode()
+        pickled_value = pickle.dumps(value)
+        with self._lock:
+            self._pending_accesses.pop(key, None)
+        with self.env.begin(write=True) as txn:
+            txn.put(encoded_key, pickled_value, db=self._values_db)
+            self._touch(txn, encoded_key)
+            self._enforce_size_limit(txn)
+
+    def _enforce_size_limit(self, txn: Any):
+        num_to_delete = txn.stat(self._values_db)["entries"] - self.max_size
+        if num_to_delete <= 0:
+            return
+        cursor = txn.cursor(db=self._order_db)
+        cursor.first()
+        for _ in range(num_to_delete):
+            key = cursor.value()
+            txn.delete(key, db=self._values_db)
+            txn.delete(key, db=self._seqs_db)
+            cursor.delete()
+
+    def reset(self, max_size: int | None = None):
+        with self._lock:
+            self._pending_accesses.clear()
+        with self.env.begin(write=True) as txn:
+            for db in (self._values_db, self._seqs_db, self._order_db):
+                txn.drop(db, delete=False)
+        if max_size is not None:
+            self.max_size = max_size
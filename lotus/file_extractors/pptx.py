@@ -59,7 +59,7 @@ class PptxReader(BaseReader):
             device (str | None): The device to use for image captioning. If None, it will be inferred.
         """
         try:
-            import torch  # noqa
+            import torch
             from PIL import Image  # noqa
             from transformers import (
                 AutoTokenizer,
@@ -72,8 +72,13 @@ class PptxReader(BaseReader):
                 "the PptxReader with Image captions: "
                 "`pip install torch transformers python-pptx Pillow`"
             )
-        device = device or infer_torch_device()
-        self.model = VisionEncoderDecoderModel.from_pretrained(caption_model).to(device)
+        self.device = device or infer_torch_device()
+        self.model = VisionEncoderDecoderModel.from_pretrained(caption_model).to(self.device)
+        self.model.eval()
+        # Captioning is inference only, so half precision is safe on GPUs
+        if torch.device(self.device).type == "cuda":
+            self.model = self.model.half()
+        self.model.generation_config.use_cache = True
         self.feature_extractor = ViTFeatureExtractor.from_pretrained(caption_model)
         self.tokenizer = AutoTokenizer.from_pretrained(caption_model)
 
@@ -87,19 +92,36 @@ class PptxReader(BaseReader):
         Returns:
             str: The generated caption for the image.
         """
+        return self.caption_images([image_bytes])[0]
+
+    def caption_images(self, images_bytes: list[bytes]) -> list[str]:
+        """
+        Generate text captions for several images with a single batched generate call.
+
+        Args:
+            images_bytes (list[bytes]): The image data in bytes, one entry per image.
+
+        Returns:
+            list[str]: The generated captions, in the same order as the images.
+        """
+        import torch
         from PIL import Image
 
-        i_image: Image.ImageFile.ImageFile | Image.Image = Image.open(BytesIO(image_bytes))
-        if i_image.mode != "RGB":
-            i_image = i_image.convert(mode="RGB")
+        images: list[Image.Image] = []
+        for image_bytes in images_bytes:
+            i_image: Image.ImageFile.ImageFile | Image.Image = Image.open(BytesIO(image_bytes))
+            if i_image.mode != "RGB":
+                i_image = i_image.convert(mode="RGB")
+            images.append(i_image)
 
-        pixel_values = self.feature_extractor(images=[i_image], return_tensors="pt").pixel_values
-        pixel_values = pixel_values.to(self.model.device)
+        pixel_values = self.feature_extractor(images=images, return_tensors="pt").pixel_values
+        pixel_values = pixel_values.to(self.device, dtype=self.model.dtype)
 
-        output_ids = self.model.generate(pixel_values, **self.gen_kwargs)
+        with torch.inference_mode():
+            output_ids = self.model.generate(pixel_values, **self.gen_kwargs)
 
         preds = self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
-        return preds[0].strip()
+        return [pred.strip() for pred in preds]
 
     def load_data(
         self,
@@ -120,20 +142,32 @@ class PptxReader(BaseReader):
         """
         from pptx import Presentation
 
-        def get_shape_text(shape):
+        def get_slide_text(slide) -> str:
             """
-            Extract text and optionally image captions from a shape.
+            Extract text and optionally image captions from all shapes on a slide.
+            Images on the slide are captioned together in one batch.
 
             Args:
-                shape: The shape object from the slide.
+                slide: The slide object from the presentation.
 
             Returns:
-                str: The extracted text and/or image caption.
+                str: The extracted text and/or image captions, in shape order.
             """
-            text = f"{shape.text}\n" if hasattr(shape, "text") else ""
-            if hasattr(shape, "image") and self.should_caption_images:
-                text += f"Image: {self.caption_image(shape.image.blob)}\n\n"
-            return text
+            shapes = list(slide.shapes)
+            captions: dict[int, str] = {}
+            if self.should_caption_images:
+                image_idxs = [idx for idx, shape in enumerate(shapes) if hasattr(shape, "image")]
+                if image_idxs:
+                    image_captions = self.caption_images([shapes[idx].image.blob for idx in image_idxs])
+                    captions = dict(zip(image_idxs, image_captions))
+
+            parts = []
+            for idx, shape in enumerate(shapes):
+                if hasattr(shape, "text"):
+                    parts.append(f"{shape.text}\n")
+                if idx in captions:
+                    parts.append(f"Image: {captions[idx]}\n\n")
+            return "".join(parts)
 
         if fs:
             with fs.open(file) as f:
@@ -143,7 +177,7 @@ class PptxReader(BaseReader):
 
         docs = []
         for i, slide in enumerate(presentation.slides):
-            text = "".join(get_shape_text(shape) for shape in slide.shapes)
+            text = get_slide_text(slide)
             metadata = {"page_label": i + 1, "file_name": file.name}
             if extra_info is not None:
                 metadata.update(extra_info)
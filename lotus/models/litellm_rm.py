@@ -5,7 +5,7 @@ from numpy.typing import NDArray
 from tqdm import tqdm
 
 from lotus.dtype_extensions import convert_to_base_data
-from lotus.models.rm import RM
+from lotus.models.rm import RM, show_progress_bars
 
 
 class LiteLLMRM(RM):
@@ -60,7 +60,7 @@ class LiteLLMRM(RM):
             Exception: If the embedding API request fails.
         """
         all_embeddings = []
-        for i in tqdm(range(0, len(docs), self.max_batch_size)):
+        for i in tqdm(range(0, len(docs), self.max_batch_size), disable=not show_progress_bars()):
             batch = docs[i : i + self.max_batch_size]
             if self.truncate_limit:
                 batch = [doc[: self.truncate_limit] for doc in batch]
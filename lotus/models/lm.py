@@ -1,9 +1,8 @@
-import hashlib
 import logging
 import math
 import time
 import warnings
-from typing import Any
+from typing import Any, cast
 
 import litellm
 import numpy as np
@@ -12,11 +11,12 @@ from litellm.exceptions import AuthenticationError
 from litellm.types.utils import ChatCompletionTokenLogprob, Choices, ModelResponse
 from litellm.utils import token_counter
 from openai._exceptions import OpenAIError
+from pydantic import TypeAdapter
 from tokenizers import Tokenizer
 from tqdm import tqdm
 
 import lotus
-from lotus.cache import CacheFactory
+from lotus.cache import CacheFactory, _update_hash, new_hasher
 from lotus.types import (
     LMOutput,
     LMStats,
@@ -29,6 +29,8 @@ from lotus.types import (
 logging.getLogger("LiteLLM").setLevel(logging.CRITICAL)
 logging.getLogger("httpx").setLevel(logging.CRITICAL)
 
+_LOGPROBS_ADAPTER: TypeAdapter[list[ChatCompletionTokenLogprob]] = TypeAdapter(list[ChatCompletionTokenLogprob])
+
 
 class LM:
     """
@@ -107,6 +109,10 @@ class LM:
 
         self.cache = cache or CacheFactory.create_default_cache()
 
+        # (input, output) cost per token, resolved lazily on the first response
+        self._price_cache: tuple[float, float] | None = None
+        self._price_cache_resolved = False
+
     def __call__(
         self,
         messages: list[list[dict[str, str]]],
@@ -121,60 +127,83 @@ class LM:
             all_kwargs.setdefault("top_logprobs", 10)
 
         if lotus.settings.enable_cache:
-            # Check cache and separate cached and uncached messages
-            hashed_messages = [self._hash_messages(msg, all_kwargs) for msg in messages]
-            cached_responses_raw = [self.cache.get(hash) for hash in hashed_messages]
-            # Filter out None values and ensure they are ModelResponse
-            cached_responses: list[ModelResponse | None] = []
-            for resp in cached_responses_raw:
-                if resp is None:
-                    cached_responses.append(None)
-                elif isinstance(resp, ModelResponse):
-                    cached_responses.append(resp)
-                else:
-                    # Skip invalid cached responses
-                    cached_responses.append(None)
+            all_responses = self._call_cached(messages, all_kwargs, show_progress_bar, progress_bar_desc)
         else:
-            hashed_messages = []
-            cached_responses = []
+            all_responses = self._call_uncached(messages, all_kwargs, show_progress_bar, progress_bar_desc)
 
-        uncached_data = (
-            [(msg, hash) for msg, hash, resp in zip(messages, hashed_messages, cached_responses) if resp is None]
-            if lotus.settings.enable_cache
-            else [(msg, "no-cache") for msg in messages]
+        outputs = [self._get_top_choice(resp) for resp in all_responses]
+        logprobs = (
+            [self._get_top_choice_logprobs(resp) for resp in all_responses] if all_kwargs.get("logprobs") else None
         )
 
-        self.stats.cache_hits += len(messages) - len(uncached_data)
+        return LMOutput(outputs=outputs, logprobs=logprobs)
 
-        # Process uncached messages in batches
-        uncached_responses = self._process_uncached_messages(
-            uncached_data, all_kwargs, show_progress_bar, progress_bar_desc
+    def _call_uncached(
+        self,
+        messages: list[list[dict[str, str]]],
+        all_kwargs: dict[str, Any],
+        show_progress_bar: bool,
+        progress_bar_desc: str,
+    ) -> list[ModelResponse]:
+        """Send every message to the LLM API without consulting or populating the cache."""
+        responses = self._process_uncached_messages(
+            [(msg, "no-cache") for msg in messages], all_kwargs, show_progress_bar, progress_bar_desc
         )
-
-        # Add new responses to cache and update stats
-        for resp, (_, hash) in zip(uncached_responses, uncached_data):
+        for resp in responses:
             self._update_stats(resp, is_cached=False)
-            if lotus.settings.enable_cache:
+        return responses
+
+    def _call_cached(
+        self,
+        messages: list[list[dict[str, str]]],
+        all_kwargs: dict[str, Any],
+        show_progress_bar: bool,
+        progress_bar_desc: str,
+    ) -> list[ModelResponse]:
+        """Serve messages from the cache where possible and send only the misses to the LLM API."""
+        # Check cache and separate cached and uncached messages
+        kwargs_suffix = self._serialize_kwargs(all_kwargs)
+        hashed_messages = [self._hash_messages(msg, kwargs_suffix) for msg in messages]
+        cached_map = self.cache.get_many(hashed_messages)
+        # Anything that is not a ModelResponse is treated as a cache miss
+        cached_responses: list[ModelResponse | None] = []
+        for hash in hashed_messages:
+            resp = cached_map.get(hash)
+            cached_responses.append(resp if isinstance(resp, ModelResponse) else None)
+
+        uncached_data = [
+            (msg, hash) for msg, hash, resp in zip(messages, hashed_messages, cached_responses) if resp is None
+        ]
+        # Identical prompts share a cache key, so each one is sent to the API only once
+        unique_data = list({hash: (msg, hash) for msg, hash in uncached_data}.values())
+        self.stats.cache_hits += len(messages) - len(unique_data)
+
+        # Process uncached messages in batches
+        unique_responses = self._process_uncached_messages(
+            unique_data, all_kwargs, show_progress_bar, progress_bar_desc
+        )
+        response_by_hash = {hash: resp for resp, (_, hash) in zip(unique_responses, unique_data)}
+
+        # Add new responses to cache and update stats; repeated prompts count as cached
+        uncached_responses = []
+        sent_hashes: set[str] = set()
+        for _, hash in uncached_data:
+            resp = response_by_hash[hash]
+            if hash in sent_hashes:
+                self._update_stats(resp, is_cached=True)
+            else:
+                sent_hashes.add(hash)
+                self._update_stats(resp, is_cached=False)
                 self._cache_response(resp, hash)
+            uncached_responses.append(resp)
 
         # Update virtual stats for cached responses
-        if lotus.settings.enable_cache:
-            for resp in cached_responses:
-                if resp is not None and isinstance(resp, ModelResponse):
-                    self._update_stats(resp, is_cached=True)
-
-        # Merge all responses in original order and extract outputs
-        all_responses = (
-            self._merge_responses(cached_responses, uncached_responses)
-            if lotus.settings.enable_cache
-            else uncached_responses
-        )
-        outputs = [self._get_top_choice(resp) for resp in all_responses]
-        logprobs = (
-            [self._get_top_choice_logprobs(resp) for resp in all_responses] if all_kwargs.get("logprobs") else None
-        )
+        for cached_resp in cached_responses:
+            if cached_resp is not None:
+                self._update_stats(cached_resp, is_cached=True)
 
-        return LMOutput(outputs=outputs, logprobs=logprobs)
+        # Merge all responses in original order
+        return self._merge_responses(cached_responses, uncached_responses)
 
     def _process_uncached_messages(
         self,
@@ -196,12 +225,18 @@ class LM:
             List of ModelResponse objects from the LLM API.
         """
         total_calls = len(uncached_data)
-
-        pbar = tqdm(
-            total=total_calls,
-            desc=progress_bar_desc,
-            disable=not show_progress_bar,
-            bar_format="{l_bar}{bar} {n}/{total} LM calls [{elapsed}<{remaining}, {rate_fmt}{postfix}]",
+        if total_calls == 0:
+            return []
+
+        # Only construct the progress bar when it is shown
+        pbar = (
+            tqdm(
+                total=total_calls,
+                desc=progress_bar_desc,
+                bar_format="{l_bar}{bar} {n}/{total} LM calls [{elapsed}<{remaining}, {rate_fmt}{postfix}]",
+            )
+            if show_progress_bar
+            else None
         )
 
         batch = [msg for msg, _ in uncached_data]
@@ -212,13 +247,15 @@ class LM:
             uncached_responses = batch_completion(
                 self.model, batch, drop_params=True, max_workers=self.max_batch_size, **all_kwargs
             )
-            pbar.update(total_calls)
+            if pbar is not None:
+                pbar.update(total_calls)
 
-        pbar.close()
+        if pbar is not None:
+            pbar.close()
         return uncached_responses
 
     def _process_with_rate_limiting(
-        self, batch: list[list[dict[str, str]]], all_kwargs: dict[str, Any], pbar: tqdm
+        self, batch: list[list[dict[str, str]]], all_kwargs: dict[str, Any], pbar: tqdm | None
     ) -> list[ModelResponse]:
         """
         Process messages with rate limiting applied.
@@ -229,7 +266,7 @@ class LM:
         Args:
             batch: List of message lists to process.
             all_kwargs: Complete keyword arguments for the LLM API.
-            pbar: Progress bar instance to update.
+            pbar: Progress bar instance to update, or None if no progress bar is shown.
 
         Returns:
             List of ModelResponse objects from the LLM API.
@@ -249,7 +286,8 @@ class LM:
                 self.model, sub_batch, drop_params=True, max_workers=self.max_batch_size, **all_kwargs
             )
             responses.extend(sub_responses)
-            pbar.update(len(sub_batch))
+            if pbar is not None:
+                pbar.update(len(sub_batch))
             end_time = time.time()
             elapsed = end_time - start_time
 
@@ -279,15 +317,38 @@ class LM:
             raise response
         self.cache.insert(hash, response)
 
-    def _hash_messages(self, messages: list[dict[str, str]], kwargs: dict[str, Any]) -> str:
-        """Hash messages and kwargs to create a unique key for the cache"""
-        to_hash = str(self.model) + str(messages) + str(kwargs)
-        return hashlib.sha256(to_hash.encode()).hexdigest()
+    def _serialize_kwargs(self, kwargs: dict[str, Any]) -> bytes:
+        """Serialize kwargs once so the same bytes can be reused for every message in a batch"""
+        return repr(sorted(kwargs.items())).encode()
+
+    def _hash_messages(self, messages: list[dict[str, str]], kwargs_suffix: bytes) -> str:
+        """Hash messages and serialized kwargs to create a unique key for the cache"""
+        # Strings are length-prefixed as in operator cache keys, so no content can mimic a field boundary
+        hasher = new_hasher()
+        _update_hash(hasher, self.model)
+        hasher.update(b"[")
+        for message in messages:
+            hasher.update(b"{")
+            for field, value in message.items():
+                _update_hash(hasher, field)
+                # Multimodal messages carry a list of content parts instead of a string
+                _update_hash(hasher, value if isinstance(value, str) else str(value))
+            hasher.update(b"}")
+        hasher.update(b"]")
+        hasher.update(b"%d:" % len(kwargs_suffix))
+        hasher.update(kwargs_suffix)
+        return hasher.hexdigest()
 
     def _merge_responses(
         self, cached_responses: list[ModelResponse | None], uncached_responses: list[ModelResponse]
     ) -> list[ModelResponse]:
         """Merge cached and uncached responses, maintaining order"""
+        # uncached_responses holds exactly one entry per None in cached_responses, so the
+        # all-hit and all-miss batches need no interleaving
+        if not uncached_responses:
+            return cast(list[ModelResponse], cached_responses)
+        if len(uncached_responses) == len(cached_responses):
+            return uncached_responses
         uncached_iter = iter(uncached_responses)
         return [resp if resp is not None else next(uncached_iter) for resp in cached_responses]
 
@@ -315,29 +376,91 @@ class LM:
             return
 
         # Calculate cost once
+        prices = self._get_token_prices()
+        if prices is not None and not self._has_special_token_usage(response.usage):
+            input_cost, output_cost = prices
+            cost: float | None = (
+                response.usage.prompt_tokens * input_cost + response.usage.completion_tokens * output_cost
+            )
+        else:
+            cost = self._get_completion_cost(response)
+
+        # Always update virtual usage
+        self._update_usage_stats(self.stats.virtual_usage, response, cost)
+        self._check_usage_limit(self.stats.virtual_usage, self.virtual_usage_limit, "virtual")
+
+        # Only update physical usage for non-cached responses
+        if not is_cached:
+            self._update_usage_stats(self.stats.physical_usage, response, cost)
+            self._check_usage_limit(self.stats.physical_usage, self.physical_usage_limit, "physical")
+
+    @staticmethod
+    def _has_special_token_usage(usage: Any) -> bool:
+        """
+        Whether the usage reports tokens beyond plain prompt and completion tokens, such as cached,
+        cache-creation, or audio tokens. Those are billed at other rates, so the flat per-token
+        prices don't apply.
+        """
+        fields = usage.model_dump() if hasattr(usage, "model_dump") else dict(vars(usage))
+        for key, value in fields.items():
+            if key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                continue
+            if isinstance(value, dict):
+                # text_tokens just restates the plain tokens
+                if any(count for name, count in value.items() if name != "text_tokens"):
+                    return True
+            elif isinstance(value, (int, float)) and value:
+                return True
+        return False
+
+    def _get_completion_cost(self, response: ModelResponse) -> float | None:
+        """Compute the cost of a single response through litellm's pricing catalog"""
         try:
-            cost = completion_cost(completion_response=response)
+            return completion_cost(completion_response=response)
         except litellm.exceptions.NotFoundError as e:
             # Sometimes the model's pricing information is not available
             lotus.logger.debug(f"Error updating completion cost: {e}")
-            cost = None
+            return None
         except Exception as e:
             # Handle any other unexpected errors when calculating cost
             lotus.logger.debug(f"Unexpected error calculating completion cost: {e}")
             warnings.warn(
                 "Error calculating completion cost - cost metrics will be inaccurate. Enable debug logging for details."
             )
+            return None
 
-            cost = None
-
-        # Always update virtual usage
-        self._update_usage_stats(self.stats.virtual_usage, response, cost)
-        self._check_usage_limit(self.stats.virtual_usage, self.virtual_usage_limit, "virtual")
+    def _get_token_prices(self) -> tuple[float, float] | None:
+        """
+        Return the (input, output) cost per token for the model if its pricing is a flat per-token rate.
 
-        # Only update physical usage for non-cached responses
-        if not is_cached:
-            self._update_usage_stats(self.stats.physical_usage, response, cost)
-            self._check_usage_limit(self.stats.physical_usage, self.physical_usage_limit, "physical")
+        The catalog lookup happens once per LM instead of once per response. Models with tiered,
+        per-character, or otherwise non-linear pricing return None so that litellm's completion_cost
+        is used for them.
+        """
+        if not self._price_cache_resolved:
+            self._price_cache_resolved = True
+            try:
+                model_info = litellm.get_model_info(self.model)
+            except Exception as e:
+                lotus.logger.debug(f"No pricing information for {self.model}: {e}")
+                return None
+
+            input_cost = model_info.get("input_cost_per_token")
+            output_cost = model_info.get("output_cost_per_token")
+            flat_rate_keys = (
+                "input_cost_per_token",
+                "output_cost_per_token",
+                "input_cost_per_token_batches",
+                "output_cost_per_token_batches",
+            )
+            non_linear_pricing = any(
+                value
+                for key, value in model_info.items()
+                if key.startswith(("input_cost_per_", "output_cost_per_")) and key not in flat_rate_keys
+            )
+            if input_cost is not None and output_cost is not None and not non_linear_pricing:
+                self._price_cache = (input_cost, output_cost)
+        return self._price_cache
 
     def _get_top_choice(self, response: ModelResponse) -> str:
         # Handle authentication errors and other exceptions
@@ -357,15 +480,19 @@ class LM:
 
         choice = response.choices[0]
         assert isinstance(choice, Choices)
-        logprobs = choice.logprobs["content"]
-        return logprobs
+        # Validate the whole token list in one pydantic-core call; model instances pass through as-is
+        return _LOGPROBS_ADAPTER.validate_python(choice.logprobs["content"])
 
     def format_logprobs_for_cascade(self, logprobs: list[list[ChatCompletionTokenLogprob]]) -> LogprobsForCascade:
         all_tokens = []
         all_confidences = []
         for resp_logprobs in logprobs:
             tokens = [logprob.token for logprob in resp_logprobs]
-            confidences = [np.exp(logprob.logprob) for logprob in resp_logprobs]
+            # One vectorized exp per response instead of a scalar ufunc call per token
+            logprob_values = np.fromiter(
+                (logprob.logprob for logprob in resp_logprobs), dtype=np.float64, count=len(resp_logprobs)
+            )
+            confidences = np.exp(logprob_values).tolist()
             all_tokens.append(tokens)
             all_confidences.append(confidences)
         return LogprobsForCascade(tokens=all_tokens, confidences=all_confidences)
@@ -388,7 +515,11 @@ class LM:
         for resp_idx, response_logprobs in enumerate(logprobs):
             true_prob = None
             for logprob in response_logprobs:
-                token_probs = {top.token: np.exp(top.logprob) for top in logprob.top_logprobs}
+                top_tokens = [top.token for top in logprob.top_logprobs]
+                top_probs = np.exp(
+                    np.fromiter((top.logprob for top in logprob.top_logprobs), dtype=np.float64, count=len(top_tokens))
+                )
+                token_probs = dict(zip(top_tokens, top_probs.tolist()))
                 true_prob = get_normalized_true_prob(token_probs)
                 if true_prob is not None:
                     break
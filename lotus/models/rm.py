@@ -1,11 +1,35 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import Union
+from contextlib import contextmanager
+from typing import Iterator, Union
 
 import numpy as np
 import pandas as pd
 from numpy.typing import NDArray
 from PIL import Image
 
+_progress = threading.local()
+
+
+@contextmanager
+def progress_bars_disabled() -> Iterator[None]:
+    """
+    Hide the progress bars of retrieval model calls made by the current thread.
+
+    Used by callers that split one large embedding job into many calls and show their own bar.
+    """
+    previous = getattr(_progress, "disabled", False)
+    _progress.disabled = True
+    try:
+        yield
+    finally:
+        _progress.disabled = previous
+
+
+def show_progress_bars() -> bool:
+    """Whether retrieval model calls on the current thread should show a progress bar."""
+    return not getattr(_progress, "disabled", False)
+
 
 class RM(ABC):
     """
@@ -5,7 +5,7 @@ from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
 
 from lotus.dtype_extensions import convert_to_base_data
-from lotus.models.rm import RM
+from lotus.models.rm import RM, show_progress_bars
 
 
 class SentenceTransformersRM(RM):
@@ -64,7 +64,7 @@ class SentenceTransformersRM(RM):
             Exception: If the embedding generation fails.
         """
         all_embeddings = []
-        for i in tqdm(range(0, len(docs), self.max_batch_size)):
+        for i in tqdm(range(0, len(docs), self.max_batch_size), disable=not show_progress_bars()):
             batch = docs[i : i + self.max_batch_size]
             _batch = convert_to_base_data(batch)
             torch_embeddings = self.transformer.encode(
@@ -6,6 +6,7 @@ __all__ = [
     "sem_topk",
     "sem_extract",
     "sem_index",
+    "sem_flush",
     "sem_search",
     "load_sem_index",
     "sem_sim_join",
@@ -0,0 +1,114 @@
+import os
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+import lotus
+from lotus.cache import new_hasher, open_lmdb_env
+from lotus.models.rm import RM
+
+# LMDB only reserves address space up front, so this is an upper bound rather than an allocation
+EMBEDDING_CACHE_MAP_SIZE = 2**32
+
+
+def describe_model(model: Any, exclude: tuple[str, ...] = ()) -> str:
+    """
+    Describe a model by its class and public scalar attributes (model name, truncation, ...).
+
+    Unlike repr, the description is stable across processes, so it can be used in on-disk keys.
+    Unset (None) attributes are skipped, since they are often state that is filled in later, and
+    other attributes that hold state rather than configuration can be left out with `exclude`.
+    """
+    params = sorted(
+        (key, value)
+        for key, value in vars(model).items()
+        if not key.startswith("_") and key not in exclude and isinstance(value, (str, int, float, bool))
+    )
+    return f"{type(model).__module__}.{type(model).__qualname__}{params}"
+
+
+def _encode(embedding: NDArray[Any]) -> bytes:
+    # Prefix the raw bytes with the 3-character dtype string (e.g. "<f4") so they can be read back as-is
+    embedding = np.ascontiguousarray(embedding)
+    return embedding.dtype.str.encode() + embedding.tobytes()
+
+
+def _decode(value: Any) -> NDArray[Any]:
+    return np.frombuffer(value[3:], dtype=bytes(value[:3]).decode())
+
+
+def get_or_compute(
+    docs: list[Any], rm: RM, cache_dir: str, map_size: int = EMBEDDING_CACHE_MAP_SIZE
+) -> NDArray[np.float32]:
+    """
+    Embed documents, reusing embeddings stored on disk by earlier calls with the same model.
+
+    Each document is keyed by a hash of the model description and its text. Only the misses are
+    sent to the retrieval model, and their embeddings are written back as float32 in one
+    transaction. Nothing is evicted: once the cache reaches `map_size`, new embeddings are
+    still returned but no longer stored. Batches that contain anything other than strings
+    (e.g. images) bypass the cache.
+
+    Args:
+        docs (list[Any]): The documents to embed.
+        rm (RM): The retrieval model used to embed cache misses.
+        cache_dir (str): The directory holding the LMDB environment.
+        map_size (int): The maximum size of the cache in bytes. Only read when the cache is
+            first opened in this process. Defaults to 4 GiB.
+
+    Returns:
+        NDArray[np.float32]: The embeddings, in the same order as `docs`.
+    """
+    if not docs or not all(isinstance(doc, str) for doc in docs):
+        return rm(docs).astype(np.float32, copy=False)
+
+    env = open_lmdb_env(os.path.join(cache_dir, "embeddings.lmdb"), map_size=map_size)
+    # open_lmdb_env raises an install hint when lmdb is missing, so this import always succeeds
+    import lmdb
+
+    # The batch size doesn't change the embeddings, so changing it shouldn't invalidate the cache
+    model_id = describe_model(rm, exclude=("max_batch_size",)).encode() + b"\x00"
+    keys = []
+    for doc in docs:
+        hasher = new_hasher()
+        hasher.update(model_id)
+        hasher.update(doc.encode())
+        keys.append(hasher.digest())
+
+    with env.begin(buffers=True) as txn:
+        misses = [i for i, key in enumerate(keys) if txn.get(key) is None]
+    # sem_index indexes float32 anyway, and storing float32 halves the cache for float64 models
+    computed = rm([docs[i] for i in misses]).astype(np.float32, copy=False) if misses else None
+
+    embeddings = None
+    if computed is not None:
+        embeddings = np.empty((len(docs), computed.shape[1]), dtype=np.float32)
+        embeddings[misses] = computed
+    if len(misses) < len(docs):
+        is_miss = np.zeros(len(docs), dtype=bool)
+        is_miss[misses] = True
+        with env.begin(buffers=True) as txn:
+            for i, key in enumerate(keys):
+                if is_miss[i]:
+                    continue
+                cached = _decode(txn.get(key))
+                if embeddings is None:
+                    embeddings = np.empty((len(docs), len(cached)), dtype=np.float32)
+                # Copy out while the transaction keeps the memory-mapped buffer valid
+                embeddings[i] = cached
+
+    if computed is not None:
+        try:
+            with env.begin(write=True) as txn:
+                for i, embedding in zip(misses, computed):
+                    txn.put(keys[i], _encode(embedding))
+        except lmdb.MapFullError:
+            # The embeddings are already paid for; don't fail the caller because they can't be stored
+            lotus.logger.warning(
+                f"Embedding cache in {cache_dir} is full, not storing {len(misses)} new embeddings. "
+                "Raise lotus.settings.embedding_cache_map_size or clear the cache."
+            )
+
+    assert embeddings is not None
+    return embeddings
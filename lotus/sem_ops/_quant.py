@@ -0,0 +1,50 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from lotus.types import QuantizedEmbeddings
+
+try:
+    from numba import njit, prange
+
+    numba_available = True
+except ImportError:
+    numba_available = False
+
+
+if numba_available:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _quantize_int8_kernel(embeddings, values, scales):
+        # One pass per row for the scale and one for the values, with no temporary arrays
+        n, d = embeddings.shape
+        for i in prange(n):
+            max_abs = 0.0
+            for j in range(d):
+                a = abs(embeddings[i, j])
+                if a > max_abs:
+                    max_abs = a
+            scale = max_abs / 127.0
+            scales[i] = scale
+            inv_scale = 1.0 / scale if scale > 0 else 0.0
+            for j in range(d):
+                values[i, j] = np.int8(np.rint(embeddings[i, j] * inv_scale))
+
+
+def quantize_int8(embeddings: NDArray[np.float32]) -> QuantizedEmbeddings:
+    """
+    Quantize embeddings to int8 with one symmetric scale per row.
+
+    Each row is scaled so that its largest absolute value maps to 127. All-zero rows get a
+    scale of 0. Uses a parallel Numba kernel when numba is installed (`pip install lotus-ai[numba]`).
+    """
+    if numba_available:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        values = np.empty(embeddings.shape, dtype=np.int8)
+        scales = np.empty(len(embeddings), dtype=np.float32)
+        _quantize_int8_kernel(embeddings, values, scales)
+        return QuantizedEmbeddings(values, scales)
+
+    scales = (np.abs(embeddings).max(axis=1) / 127).astype(np.float32)
+    inv_scales = np.divide(1, scales, out=np.zeros_like(scales), where=scales > 0)
+    values = np.rint(embeddings * inv_scales[:, None]).astype(np.int8)
+    return QuantizedEmbeddings(values, scales)
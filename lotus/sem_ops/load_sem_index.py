@@ -2,6 +2,8 @@ from typing import Any
 
 import pandas as pd
 
+from lotus.utils import register_index_dir
+
 
 @pd.api.extensions.register_dataframe_accessor("load_sem_index")
 class LoadSemIndexDataframe:
@@ -39,7 +41,6 @@ class LoadSemIndexDataframe:
     def __init__(self, pandas_obj: Any):
         self._validate(pandas_obj)
         self._obj = pandas_obj
-        self._obj.attrs["index_dirs"] = {}
 
     @staticmethod
     def _validate(obj: Any) -> None:
@@ -47,5 +48,5 @@ class LoadSemIndexDataframe:
             raise AttributeError("Must be a DataFrame")
 
     def __call__(self, col_name: str, index_dir: str) -> pd.DataFrame:
-        self._obj.attrs["index_dirs"][col_name] = index_dir
+        register_index_dir(self._obj, col_name, index_dir)
         return self._obj
@@ -0,0 +1,43 @@
+from typing import Any
+
+import pandas as pd
+
+import lotus
+from lotus.utils import get_index_dirs
+
+
+@pd.api.extensions.register_dataframe_accessor("sem_flush")
+class SemFlushDataframe:
+    """
+    Wait for the deferred index builds of the DataFrame's indexed columns to finish.
+
+    Semantic operators already wait for the index they use, so this is only needed to make sure
+    the index directories are complete on disk, or to surface build errors early.
+
+    Returns:
+        pd.DataFrame: The DataFrame.
+
+        Example:
+            >>> df.sem_index('title', 'title_index', defer_build=True)
+            >>> df.sem_flush()
+    """
+
+    def __init__(self, pandas_obj: Any):
+        self._validate(pandas_obj)
+        self._obj = pandas_obj
+
+    @staticmethod
+    def _validate(obj: Any) -> None:
+        if not isinstance(obj, pd.DataFrame):
+            raise AttributeError("Must be a DataFrame")
+
+    def __call__(self) -> pd.DataFrame:
+        vs = lotus.settings.vs
+        if vs is None:
+            raise ValueError(
+                "The vector store must be an instance of VS. Please configure a valid vector store using lotus.settings.configure()"
+            )
+
+        for index_dir in get_index_dirs(self._obj).values():
+            vs.wait_for_index(index_dir)
+        return self._obj
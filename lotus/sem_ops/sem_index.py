@@ -1,9 +1,227 @@
-from typing import Any
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterator, Literal
 
+import numpy as np
 import pandas as pd
+from numpy.typing import NDArray
+from tqdm import tqdm
 
 import lotus
-from lotus.cache import operator_cache
+from lotus.cache import new_hasher, operator_cache
+from lotus.dtype_extensions import ImageDtype
+from lotus.models.rm import RM, progress_bars_disabled, show_progress_bars
+from lotus.sem_ops._emb_cache import describe_model, get_or_compute
+from lotus.sem_ops._quant import quantize_int8
+from lotus.types import QuantizedEmbeddings
+from lotus.utils import register_index_dir
+from lotus.vector_store.vs import VS
+
+
+def iter_embedding_batches(
+    embed: Callable[[list[Any]], NDArray[np.floating[Any]]],
+    docs: list[Any],
+    batch_size: int,
+    max_concurrency: int,
+    show_progress_bar: bool = True,
+) -> Iterator[NDArray[np.floating[Any]]]:
+    """
+    Embed documents in fixed-size batches, dispatching up to `max_concurrency` batches at once.
+
+    API-backed embedding models are bound by request latency rather than local compute, so
+    keeping several batches in flight hides most of the per-request overhead. Batches are
+    yielded in order as soon as they are ready, and the worker threads keep embedding ahead
+    while the caller consumes them. Progress is shown in a single bar over all documents
+    rather than one bar per retrieval model call.
+
+    Args:
+        embed (Callable[[list[Any]], NDArray[np.floating[Any]]]): Embeds one batch of documents.
+        docs (list[Any]): The documents to embed.
+        batch_size (int): The number of documents sent to the retrieval model per call.
+        max_concurrency (int): The maximum number of batches embedded concurrently.
+        show_progress_bar (bool): Whether to show a progress bar. Defaults to True.
+
+    Yields:
+        NDArray[np.floating[Any]]: The embeddings of each batch, in the same order as `docs`.
+    """
+    if batch_size < 1 or max_concurrency < 1:
+        raise ValueError("batch_size and max_concurrency must be positive")
+
+    batches = [docs[i : i + batch_size] for i in range(0, len(docs), batch_size)]
+    if not batches:
+        return
+
+    def embed_quietly(batch: list[Any]) -> NDArray[np.floating[Any]]:
+        with progress_bars_disabled():
+            return embed(batch)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches)))
+    try:
+        # Callers that run several embedding jobs at once (sem_index.index_many) hide the per-job bars
+        show = show_progress_bar and show_progress_bars()
+        with tqdm(total=len(docs), desc="Embedding", disable=not show) as pbar:
+            # map yields results in submission order, so rows stay aligned with docs
+            for embeddings in executor.map(embed_quietly, batches):
+                pbar.update(len(embeddings))
+                yield embeddings
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def normalize_in_place(embeddings: NDArray[np.float32]) -> None:
+    """L2-normalize the rows of `embeddings` in place. All-zero rows are left as they are."""
+    # einsum computes the squared norms in one pass without materializing embeddings**2
+    norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))
+    np.divide(embeddings, norms[:, None], out=embeddings, where=norms[:, None] > 0)
+
+
+def is_arrow_backed(dtype: Any) -> bool:
+    """Whether a column's values are stored in Arrow buffers (`pd.ArrowDtype` or `pd.StringDtype("pyarrow")`)."""
+    return isinstance(dtype, pd.ArrowDtype) or (
+        isinstance(dtype, pd.StringDtype) and dtype.storage in ("pyarrow", "pyarrow_numpy")
+    )
+
+
+def factorize_docs(docs: pd.Series) -> tuple[NDArray[np.intp], list[Any]]:
+    """
+    Split a column into its distinct non-null values and, for each row, the position of its value.
+
+    Rows with missing values get the code -1. Columns whose values cannot be factorized (e.g.
+    images) are returned as-is, with one code per row.
+
+    Args:
+        docs (pd.Series): The column to factorize.
+
+    Returns:
+        tuple[NDArray[np.intp], list[Any]]: The per-row codes and the distinct values.
+    """
+    try:
+        codes, uniques = pd.factorize(docs, use_na_sentinel=True)
+    except (TypeError, NotImplementedError):
+        return np.arange(len(docs)), docs.tolist()
+    if is_arrow_backed(docs.dtype):
+        # Arrow columns are factorized on the Arrow buffers (dictionary_encode), but tolist() would
+        # box every value into a pandas scalar one at a time; convert the whole array in C instead
+        return codes, uniques.to_numpy(dtype=object).tolist()
+    return codes, uniques.tolist()
+
+
+def index_column(
+    embed: Callable[[list[Any]], NDArray[np.floating[Any]]],
+    vs: VS,
+    docs: NDArray[Any],
+    codes: NDArray[np.intp],
+    uniques: list[Any],
+    index_dir: str,
+    batch_size: int,
+    max_concurrency: int,
+    dtype: Literal["fp32", "fp16", "int8"] = "fp32",
+    defer_build: bool = False,
+    normalize: bool = False,
+) -> Future | None:
+    """
+    Embed the distinct values of a column and stream the rows into the vector store.
+
+    The vector store indexes each run of rows as soon as every value it references has been
+    embedded, while the remaining batches are still being embedded.
+
+    Args:
+        embed (Callable[[list[Any]], NDArray[np.floating[Any]]]): Embeds one batch of values.
+        vs (VS): The vector store to build the index in.
+        docs (NDArray[Any]): The values of the column, one per row.
+        codes (NDArray[np.intp]): The position of each row's value in `uniques`, or -1 for missing values.
+        uniques (list[Any]): The distinct values of the column.
+        index_dir (str): The directory to save the index.
+        batch_size (int): The number of values sent to the retrieval model per call.
+        max_concurrency (int): The maximum number of embedding calls in flight at once.
+        dtype (Literal["fp32", "fp16", "int8"]): The precision of the vectors handed to the vector store.
+        defer_build (bool): Whether to build the index on a background thread once everything is embedded.
+        normalize (bool): Whether to L2-normalize the embeddings before indexing them.
+
+    Returns:
+        Future | None: The background build if `defer_build` is set, otherwise None.
+    """
+    # factorize numbers values by first appearance, so once the first k values are embedded,
+    # every row before the first occurrence of value k can be indexed
+    first_rows = np.flatnonzero(np.diff(np.maximum.accumulate(codes), prepend=-1))
+
+    def row_batches() -> Iterator[tuple[Any, NDArray[Any] | QuantizedEmbeddings]]:
+        unique_embeddings = None
+        num_embedded = 0
+        row_start = 0
+        for batch in iter_embedding_batches(embed, uniques, batch_size, max_concurrency):
+            if unique_embeddings is None:
+                # The first batch tells us the dimension. Vector stores index float32, so downcast
+                # while copying in rather than holding a float64 copy of every embedding.
+                unique_embeddings = np.empty((len(uniques), batch.shape[1]), dtype=np.float32)
+            np.copyto(unique_embeddings[num_embedded : num_embedded + len(batch)], batch, casting="same_kind")
+            if normalize:
+                normalize_in_place(unique_embeddings[num_embedded : num_embedded + len(batch)])
+            num_embedded += len(batch)
+
+            row_end = first_rows[num_embedded] if num_embedded < len(uniques) else len(codes)
+            if row_end > row_start:
+                batch_codes = codes[row_start:row_end]
+                embeddings = unique_embeddings[batch_codes]
+                # Missing values are not embedded; give them a zero vector
+                embeddings[batch_codes < 0] = 0
+                if dtype == "fp16":
+                    yield docs[row_start:row_end], embeddings.astype(np.float16)
+                elif dtype == "int8":
+                    yield docs[row_start:row_end], quantize_int8(embeddings)
+                else:
+                    yield docs[row_start:row_end], embeddings
+            row_start = row_end
+
+    if defer_build:
+        # Embed everything up front so that embedding errors still surface to the caller
+        return vs.index_async(list(row_batches()), index_dir)
+    vs.index_batches(row_batches(), index_dir)
+    return None
+
+
+# Written into the index directory after a successful build to detect rebuilds of identical inputs
+FINGERPRINT_FILE = ".lotus_fp"
+
+
+def index_fingerprint(docs: pd.Series, rm: RM, vs: VS, **params: Any) -> str | None:
+    """
+    Fingerprint the inputs of an index build: the column values, the retrieval model, the vector
+    store and the build parameters.
+
+    Returns:
+        str | None: The fingerprint, or None if the column values cannot be hashed.
+    """
+    try:
+        row_hashes = pd.util.hash_pandas_object(docs, index=False).to_numpy()
+    except TypeError:
+        return None
+    hasher = new_hasher()
+    hasher.update(row_hashes.tobytes())
+    hasher.update(describe_model(rm).encode())
+    hasher.update(describe_model(vs, exclude=("index_dir",)).encode())
+    hasher.update(repr(sorted(params.items())).encode())
+    return hasher.hexdigest()
+
+
+def read_fingerprint(index_dir: str) -> str | None:
+    try:
+        with open(os.path.join(index_dir, FINGERPRINT_FILE)) as fp:
+            return fp.read()
+    except OSError:
+        return None
+
+
+def write_fingerprint(index_dir: str, fingerprint: str | None) -> None:
+    path = os.path.join(index_dir, FINGERPRINT_FILE)
+    if fingerprint is None:
+        if os.path.exists(path):
+            os.remove(path)
+    # Vector stores that don't keep the index on local disk (e.g. Qdrant) never create the directory
+    elif os.path.isdir(index_dir):
+        with open(path, "w") as fp:
+            fp.write(fingerprint)
 
 
 @pd.api.extensions.register_dataframe_accessor("sem_index")
@@ -15,6 +233,16 @@ class SemIndexDataframe:
     Args:
         col_name (str): The column name to index.
         index_dir (str): The directory to save the index.
+        embed_batch_size (int): The number of rows sent to the retrieval model per call. Defaults to 128.
+        max_concurrency (int): The maximum number of embedding calls in flight at once. Raise it for API-backed
+            retrieval models (e.g. LiteLLMRM); local models gain nothing from concurrent calls. Defaults to 1.
+        dtype (Literal["fp32", "fp16", "int8"]): The precision of the stored vectors. "fp16" halves and "int8"
+            (per-row symmetric scaling) quarters the bytes written and loaded at query time. Defaults to "fp32".
+        defer_build (bool): Return as soon as the column is embedded and build the index on a background
+            thread. Semantic operators wait for the build before using the index; call df.sem_flush() to wait
+            explicitly. Defaults to False.
+        normalize (bool): L2-normalize the embeddings before indexing them, so that inner-product search ranks
+            by cosine similarity. Not needed for retrieval models that already normalize. Defaults to False.
 
     Returns:
         pd.DataFrame: The DataFrame with the index directory saved.
@@ -51,15 +279,32 @@ class SemIndexDataframe:
     def __init__(self, pandas_obj: Any) -> None:
         self._validate(pandas_obj)
         self._obj = pandas_obj
-        self._obj.attrs["index_dirs"] = {}
 
     @staticmethod
     def _validate(obj: Any) -> None:
         if not isinstance(obj, pd.DataFrame):
             raise AttributeError("Must be a DataFrame")
 
+    @staticmethod
+    def _validate_column(col_name: str, docs: pd.Series) -> None:
+        # Reject columns that cannot be embedded before any embedding calls are made
+        dtype = docs.dtype.categories.dtype if isinstance(docs.dtype, pd.CategoricalDtype) else docs.dtype
+        if not (pd.api.types.is_string_dtype(dtype) or isinstance(dtype, ImageDtype)):
+            raise ValueError(f"Column {col_name} must contain text or images to be indexed, got dtype {docs.dtype}")
+        if not docs.notna().any():
+            raise ValueError(f"Column {col_name} has no values to index")
+
     @operator_cache
-    def __call__(self, col_name: str, index_dir: str) -> pd.DataFrame:
+    def __call__(
+        self,
+        col_name: str,
+        index_dir: str,
+        embed_batch_size: int = 128,
+        max_concurrency: int = 1,
+        dtype: Literal["fp32", "fp16", "int8"] = "fp32",
+        defer_build: bool = False,
+        normalize: bool = False,
+    ) -> pd.DataFrame:
         lotus.logger.warning(
             "Do not reset the dataframe index to ensure proper functionality of get_vectors_from_index"
         )
@@ -71,7 +316,104 @@ class SemIndexDataframe:
                 "The retrieval model must be an instance of RM, and the vector store must be an instance of VS. Please configure a valid retrieval model using lotus.settings.configure()"
             )
 
-        embeddings = rm(self._obj[col_name].tolist())
-        vs.index(self._obj[col_name], embeddings, index_dir)
-        self._obj.attrs["index_dirs"][col_name] = index_dir
+        if dtype not in ("fp32", "fp16", "int8"):
+            raise ValueError(f"dtype must be one of 'fp32', 'fp16' or 'int8', got {dtype!r}")
+        if col_name not in self._obj.columns:
+            raise ValueError(f"Column {col_name} not found in DataFrame")
+        # Look the column up once and share it between the retrieval model and the vector store
+        docs = self._obj[col_name]
+        self._validate_column(col_name, docs)
+        # Don't write to a directory that a deferred build is still writing to
+        vs.wait_for_index(index_dir)
+
+        fingerprint = index_fingerprint(docs, rm, vs, dtype=dtype, normalize=normalize)
+        if fingerprint is not None and read_fingerprint(index_dir) == fingerprint:
+            lotus.logger.debug(f"Index in {index_dir} is up to date, skipping indexing")
+            register_index_dir(self._obj, col_name, index_dir)
+            return self._obj
+        # Invalidate the old fingerprint until the new index is complete
+        write_fingerprint(index_dir, None)
+
+        embed: Callable[[list[Any]], NDArray[np.floating[Any]]] = rm
+        if lotus.settings.embedding_cache_dir is not None:
+            embed = partial(
+                get_or_compute,
+                rm=rm,
+                cache_dir=lotus.settings.embedding_cache_dir,
+                map_size=lotus.settings.embedding_cache_map_size,
+            )
+
+        # Only embed each distinct value once and scatter the result back to the rows
+        codes, uniques = factorize_docs(docs)
+        build = index_column(
+            embed,
+            vs,
+            docs.to_numpy(copy=False),
+            codes,
+            uniques,
+            index_dir,
+            embed_batch_size,
+            max_concurrency,
+            dtype,
+            defer_build,
+            normalize,
+        )
+        if build is None:
+            write_fingerprint(index_dir, fingerprint)
+        else:
+            build.add_done_callback(
+                lambda future: write_fingerprint(index_dir, fingerprint) if future.exception() is None else None
+            )
+        register_index_dir(self._obj, col_name, index_dir)
+        return self._obj
+
+    def index_many(self, cols: list[tuple[str, str]], max_workers: int = 1, **kwargs: Any) -> pd.DataFrame:
+        """
+        Index several columns, optionally embedding them in parallel.
+
+        The indexes are built one at a time on the vector store's background thread, so the next
+        column is embedded while the previous one is being built. When several columns are embedded
+        at once, a single progress bar over the columns replaces the per-column bars.
+
+        Args:
+            cols (list[tuple[str, str]]): The (column name, index directory) pairs to index.
+            max_workers (int): The maximum number of columns embedded at once. Raise it for API-backed
+                retrieval models (e.g. LiteLLMRM); local models gain nothing from concurrent calls. Defaults to 1.
+            **kwargs: Passed to sem_index for every column (embed_batch_size, dtype, defer_build, ...).
+
+        Returns:
+            pd.DataFrame: The DataFrame with the index directories saved.
+
+            Example:
+                >>> df.sem_index.index_many([('title', 'title_index'), ('abstract', 'abstract_index')])
+        """
+        index_dirs = [index_dir for _, index_dir in cols]
+        if len(set(index_dirs)) != len(index_dirs):
+            raise ValueError("Each column must be indexed into a different directory")
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive")
+        if not cols:
+            return self._obj
+        defer_build = kwargs.pop("defer_build", False)
+        max_workers = min(max_workers, len(cols))
+
+        def index_column_quietly(col_name: str, index_dir: str) -> pd.DataFrame:
+            with progress_bars_disabled():
+                return self(col_name, index_dir, defer_build=True, **kwargs)
+
+        index_one = index_column_quietly if max_workers > 1 else partial(self, defer_build=True, **kwargs)
+        with (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lotus-sem-index") as executor,
+            tqdm(total=len(cols), desc="Indexing columns", disable=max_workers == 1) as pbar,
+        ):
+            futures = [executor.submit(index_one, col_name, index_dir) for col_name, index_dir in cols]
+            for future in futures:
+                future.result()
+                pbar.update(1)
+
+        if not defer_build:
+            vs = lotus.settings.vs
+            assert vs is not None
+            for index_dir in index_dirs:
+                vs.wait_for_index(index_dir)
         return self._obj
@@ -5,6 +5,7 @@ import pandas as pd
 import lotus
 from lotus.cache import operator_cache
 from lotus.types import RerankerOutput, RMOutput
+from lotus.utils import get_index_dirs
 
 
 @pd.api.extensions.register_dataframe_accessor("sem_search")
@@ -108,7 +109,8 @@ class SemSearchDataframe:
                     "The retrieval model must be an instance of RM, and the vector store should be an instance of VS. Please configure a valid retrieval model and vector store using lotus.settings.configure()"
                 )
 
-            col_index_dir = self._obj.attrs["index_dirs"][col_name]
+            col_index_dir = get_index_dirs(self._obj)[col_name]
+            vs.wait_for_index(col_index_dir)
             if vs.index_dir != col_index_dir:
                 vs.load_index(col_index_dir)
             assert vs.index_dir == col_index_dir
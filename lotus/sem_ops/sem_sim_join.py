@@ -6,6 +6,7 @@ import lotus
 from lotus.cache import operator_cache
 from lotus.models import RM
 from lotus.types import RMOutput
+from lotus.utils import get_index_dirs
 from lotus.vector_store import VS
 
 
@@ -106,8 +107,10 @@ class SemSimJoinDataframe:
             )
 
         # load query embeddings from index if they exist
-        if left_on in self._obj.attrs.get("index_dirs", []):
-            query_index_dir = self._obj.attrs["index_dirs"][left_on]
+        index_dirs = get_index_dirs(self._obj)
+        if left_on in index_dirs:
+            query_index_dir = index_dirs[left_on]
+            vs.wait_for_index(query_index_dir)
             if vs.index_dir != query_index_dir:
                 vs.load_index(query_index_dir)
             assert vs.index_dir == query_index_dir
@@ -120,9 +123,10 @@ class SemSimJoinDataframe:
 
         # load index to search over
         try:
-            col_index_dir = other.attrs["index_dirs"][right_on]
+            col_index_dir = get_index_dirs(other)[right_on]
         except KeyError:
             raise ValueError(f"Index directory for column {right_on} not found in DataFrame")
+        vs.wait_for_index(col_index_dir)
         if vs.index_dir != col_index_dir:
             vs.load_index(col_index_dir)
         assert vs.index_dir == col_index_dir
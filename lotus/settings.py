@@ -15,6 +15,8 @@ class Settings:
 
     # Cache settings
     enable_cache: bool = False
+    embedding_cache_dir: str | None = None  # reuse embeddings across sem_index calls when set
+    embedding_cache_map_size: int = 2**32  # maximum size of the embedding cache in bytes
 
     # Serialization setting
     serialization_format: SerializationFormat = SerializationFormat.DEFAULT
@@ -2,8 +2,10 @@ from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Any
 
+import numpy as np
 import pandas as pd
 from litellm.types.utils import ChatCompletionTokenLogprob
+from numpy.typing import NDArray
 from pydantic import BaseModel
 
 
@@ -169,6 +171,23 @@ class RMOutput:
     indices: list[list[int]]
 
 
+@dataclass
+class QuantizedEmbeddings:
+    """Embeddings stored as int8 with one symmetric scale per row: row i is values[i] * scales[i]."""
+
+    values: NDArray[np.int8]
+    scales: NDArray[np.float32]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, ids: Any) -> "QuantizedEmbeddings":
+        return QuantizedEmbeddings(self.values[ids], self.scales[ids])
+
+    def dequantize(self) -> NDArray[np.float32]:
+        return self.values * self.scales[:, None]
+
+
 ################################################################################
 # Reranker related
 ################################################################################
@@ -1,7 +1,8 @@
 import base64
+import threading
 import time
 from io import BytesIO
-from typing import Callable
+from typing import Any, Callable, Mapping
 
 import numpy as np
 import pandas as pd
@@ -11,6 +12,62 @@ from PIL import Image
 import lotus
 
 
+class IndexDirs(dict[str, str]):
+    """
+    Read-only dict from column names to index directories, stored in `DataFrame.attrs`.
+
+    pandas deep-copies `attrs` on almost every operation (`.copy`, `.loc`, arithmetic, ...). The
+    mapping never changes once created, so deep copies share it instead of copying every entry.
+    It stays a dict so that `attrs` remains JSON-serializable (e.g. for `to_parquet`).
+    """
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("IndexDirs is read-only; use register_index_dir to register an index")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only  # type: ignore[assignment]
+    clear = pop = popitem = setdefault = update = _read_only  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"IndexDirs({dict.__repr__(self)})"
+
+    def __copy__(self) -> "IndexDirs":
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "IndexDirs":
+        return self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # The default dict-subclass pickling restores items through __setitem__
+        return (IndexDirs, (dict(self),))
+
+
+def get_index_dirs(df: pd.DataFrame) -> Mapping[str, str]:
+    """
+    Get the index directories registered for the columns of a DataFrame.
+
+    Args:
+        df (pd.DataFrame): The DataFrame.
+
+    Returns:
+        Mapping[str, str]: The index directory of each indexed column.
+    """
+    return df.attrs.get("index_dirs") or IndexDirs()
+
+
+# Columns of the same DataFrame can be indexed from several threads (sem_index.index_many)
+_index_dirs_lock = threading.Lock()
+
+
+def register_index_dir(df: pd.DataFrame, col_name: str, index_dir: str) -> None:
+    """
+    Register the index directory of a column, keeping the indexes of the other columns.
+
+    The mapping is replaced rather than updated, since frames derived from `df` may share it.
+    """
+    with _index_dirs_lock:
+        df.attrs["index_dirs"] = IndexDirs({**get_index_dirs(df), col_name: index_dir})
+
+
 def cluster(col_name: str, ncentroids: int) -> Callable[[pd.DataFrame, int, bool], list[int]]:
     """
     Returns a function that clusters a DataFrame by a column using kmeans.
@@ -47,10 +104,11 @@ def cluster(col_name: str, ncentroids: int) -> Callable[[pd.DataFrame, int, bool
             )
 
         try:
-            col_index_dir = df.attrs["index_dirs"][col_name]
+            col_index_dir = get_index_dirs(df)[col_name]
         except KeyError:
             raise ValueError(f"Index directory for column {col_name} not found in DataFrame")
 
+        vs.wait_for_index(col_index_dir)
         if vs.index_dir != col_index_dir:
             vs.load_index(col_index_dir)
         assert vs.index_dir == col_index_dir
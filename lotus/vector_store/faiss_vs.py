@@ -1,12 +1,14 @@
+import copy
 import os
 import pickle
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable
 
 import faiss
 import numpy as np
 from numpy.typing import NDArray
 
-from lotus.types import RMOutput
+from lotus.types import QuantizedEmbeddings, RMOutput
 from lotus.vector_store.vs import VS
 
 
@@ -17,17 +19,59 @@ class FaissVS(VS):
         self.metric = metric
         self.index_dir: str | None = None
         self.faiss_index: faiss.Index | None = None
-        self.vecs: NDArray[np.float64] | None = None
+        self.vecs: NDArray[np.float64] | QuantizedEmbeddings | None = None
+
+    def _clone_for_build(self) -> "FaissVS":
+        # The FAISS index lives in memory, so build on a copy and keep the loaded index in place
+        return copy.copy(self)
 
     def index(self, docs: list[str], embeddings: NDArray[np.float64], index_dir: str, **kwargs: dict[str, Any]) -> None:
-        self.faiss_index = faiss.index_factory(embeddings.shape[1], self.factory_string, self.metric)
-        self.faiss_index.add(embeddings)
+        self.index_batches([(docs, embeddings)], index_dir, **kwargs)
+
+    def index_batches(
+        self,
+        batches: Iterable[tuple[list[str], NDArray[np.float64] | QuantizedEmbeddings]],
+        index_dir: str,
+        **kwargs: dict[str, Any],
+    ) -> None:
+        faiss_index: faiss.Index | None = None
+        all_embeddings: list[Any] = []
+        for _, embeddings in batches:
+            # FAISS indexes float vectors; quantized batches are only kept compact in the vecs file
+            vectors = embeddings.dequantize() if isinstance(embeddings, QuantizedEmbeddings) else embeddings
+            if faiss_index is None:
+                faiss_index = faiss.index_factory(vectors.shape[1], self.factory_string, self.metric)
+            faiss_index.add(vectors)
+            all_embeddings.append(embeddings)
+        if faiss_index is None:
+            raise ValueError("Cannot create an index without any embeddings")
+
+        vecs: NDArray[np.float64] | QuantizedEmbeddings
+        if len(all_embeddings) == 1:
+            vecs = all_embeddings[0]
+        elif isinstance(all_embeddings[0], QuantizedEmbeddings):
+            vecs = QuantizedEmbeddings(
+                np.concatenate([batch.values for batch in all_embeddings]),
+                np.concatenate([batch.scales for batch in all_embeddings]),
+            )
+        else:
+            vecs = np.vstack(all_embeddings)
+        self.faiss_index = faiss_index
         self.index_dir = index_dir
+        self.vecs = vecs
 
         os.makedirs(index_dir, exist_ok=True)
+        # The vectors file and the FAISS index are independent and both writes release the GIL
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            vecs_written = executor.submit(self._write_vecs, vecs, index_dir)
+            faiss.write_index(faiss_index, f"{index_dir}/index")
+            vecs_written.result()
+
+    @staticmethod
+    def _write_vecs(vecs: NDArray[np.float64] | QuantizedEmbeddings, index_dir: str) -> None:
         with open(f"{index_dir}/vecs", "wb") as fp:
-            pickle.dump(embeddings, fp)
-        faiss.write_index(self.faiss_index, f"{index_dir}/index")
+            # Protocol 5 writes array buffers straight to the file instead of first copying them into bytes
+            pickle.dump(vecs, fp, protocol=5)
 
     def load_index(self, index_dir: str) -> None:
         self.index_dir = index_dir
@@ -36,8 +80,15 @@ class FaissVS(VS):
             self.vecs = pickle.load(fp)
 
     def get_vectors_from_index(self, index_dir: str, ids: list[int]) -> NDArray[np.float64]:
-        with open(f"{index_dir}/vecs", "rb") as fp:
-            vecs: NDArray[np.float64] = pickle.load(fp)
+        vecs: NDArray[np.float64] | QuantizedEmbeddings
+        if index_dir == self.index_dir and self.vecs is not None:
+            # Reuse the vectors loaded with the index instead of reading the whole file again
+            vecs = self.vecs
+        else:
+            with open(f"{index_dir}/vecs", "rb") as fp:
+                vecs = pickle.load(fp)
+        if isinstance(vecs, QuantizedEmbeddings):
+            return vecs[ids].dequantize()  # type: ignore
         return vecs[ids]
 
     def __call__(
@@ -1,15 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, ClassVar, Iterable
 
 import numpy as np
 from numpy.typing import NDArray
 
-from lotus.types import RMOutput
+from lotus.types import QuantizedEmbeddings, RMOutput
 
 
 class VS(ABC):
     """Abstract class for vector stores."""
 
+    # Index builds running in the background, keyed by index directory. Shared by all vector stores
+    # so that a build is waited for even if the configured store is replaced in the meantime.
+    _pending_builds: ClassVar[dict[str, Future]] = {}
+    _build_executor: ClassVar[ThreadPoolExecutor] = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="lotus-index-build"
+    )
+
     def __init__(self) -> None:
         self.index_dir: str | None = None
 
@@ -20,6 +28,75 @@ class VS(ABC):
         """
         pass
 
+    def index_batches(
+        self,
+        batches: Iterable[tuple[list[str], NDArray[np.float64] | QuantizedEmbeddings]],
+        index_dir: str,
+        **kwargs: dict[str, Any],
+    ):
+        """
+        Create index from batches of documents and embeddings that arrive in row order.
+
+        Lets the caller keep producing embeddings while earlier batches are being indexed. The default
+        implementation collects every batch, dequantizing int8 batches, and calls `index`; stores that
+        can build incrementally or keep quantized vectors should override it.
+        """
+        all_docs: list[str] = []
+        all_embeddings = []
+        for docs, embeddings in batches:
+            all_docs.extend(docs)
+            all_embeddings.append(
+                embeddings.dequantize() if isinstance(embeddings, QuantizedEmbeddings) else embeddings
+            )
+        self.index(all_docs, np.vstack(all_embeddings), index_dir, **kwargs)
+
+    def index_async(
+        self,
+        batches: Iterable[tuple[list[str], NDArray[np.float64] | QuantizedEmbeddings]],
+        index_dir: str,
+        **kwargs: dict[str, Any],
+    ) -> Future:
+        """
+        Create index like `index_batches`, but on a background thread.
+
+        The build runs on the store returned by `_clone_for_build`. Builds run one at a time, so
+        the default of building on this store itself is safe. Call `wait_for_index` before
+        reading the index directory.
+        """
+        if self.index_dir == index_dir:
+            # Whatever is loaded from this directory is about to be replaced; force a reload
+            self.index_dir = None
+        future = self._build_executor.submit(self._clone_for_build().index_batches, batches, index_dir, **kwargs)
+        self._pending_builds[index_dir] = future
+        return future
+
+    def _clone_for_build(self) -> "VS":
+        """
+        Return the store that a background build runs on.
+
+        Stores that hold their index in memory can return a copy, so the build does not replace
+        the index this store has loaded. Stores that own external resources such as clients must
+        not return a shallow copy: the copy shares the client, and a destructor that closes it
+        would close the client of this store too.
+        """
+        return self
+
+    def wait_for_index(self, index_dir: str) -> None:
+        """
+        Block until a background build of the index in index_dir, if any, has finished.
+
+        Re-raises the exception if the build failed.
+        """
+        future = self._pending_builds.get(index_dir)
+        if future is None:
+            return
+        try:
+            future.result()
+        finally:
+            # A later build of the same directory may have replaced the entry in the meantime
+            if self._pending_builds.get(index_dir) is future:
+                del self._pending_builds[index_dir]
+
     @abstractmethod
     def load_index(self, index_dir: str):
         """
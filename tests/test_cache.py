@@ -0,0 +1,292 @@
+import pickle
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import lotus
+from lotus.cache import (
+    CacheConfig,
+    CacheFactory,
+    CacheType,
+    InMemoryCache,
+    LMDBCache,
+    SQLiteCache,
+    _update_hash,
+    new_hasher,
+    operator_cache,
+)
+from lotus.models import LM
+from tests.base_test import BaseTest
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    return SQLiteCache(max_size=4, cache_dir=str(tmp_path), eviction_interval=2)
+
+
+class TestSQLiteCache(BaseTest):
+    def test_insert_and_get(self, sqlite_cache):
+        sqlite_cache.insert("key", {"value": 1})
+        assert sqlite_cache.get("key") == {"value": 1}
+        assert sqlite_cache.get("missing") is None
+
+    def test_get_many(self, tmp_path):
+        cache = SQLiteCache(max_size=2000, cache_dir=str(tmp_path))
+        for i in range(SQLiteCache.MAX_QUERY_PARAMS + 10):
+            cache.insert(f"key{i}", i)
+        keys = [f"key{i}" for i in range(SQLiteCache.MAX_QUERY_PARAMS + 10)] + ["missing", "key0"]
+        result = cache.get_many(keys)
+        assert len(result) == SQLiteCache.MAX_QUERY_PARAMS + 10
+        assert result["key3"] == 3
+        assert "missing" not in result
+
+    def test_model_response_stored_as_json(self, sqlite_cache):
+        from litellm.types.utils import ModelResponse, Usage
+
+        response = ModelResponse(
+            model="gpt-4o-mini",
+            choices=[{"message": {"role": "assistant", "content": "Paris"}, "index": 0}],
+            usage=Usage(prompt_tokens=5, completion_tokens=1, total_tokens=6),
+        )
+        sqlite_cache.insert("response", response)
+        sqlite_cache.insert("other", {"value": 1})
+
+        versions = dict(sqlite_cache._get_connection().execute("SELECT key, version FROM cache").fetchall())
+        assert versions == {"response": SQLiteCache.MODEL_RESPONSE_JSON_VERSION, "other": SQLiteCache.PICKLE_VERSION}
+
+        cached = sqlite_cache.get_many(["response", "other"])
+        assert isinstance(cached["response"], ModelResponse)
+        assert cached["response"].choices[0].message.content == "Paris"
+        assert cached["response"].usage.total_tokens == 6
+        assert cached["other"] == {"value": 1}
+
+    def test_wal_mode_enabled(self, sqlite_cache):
+        conn = sqlite_cache._get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_size_limit_enforced_every_interval(self, sqlite_cache):
+        for i in range(6):
+            sqlite_cache.insert(f"key{i}", i)
+        count = sqlite_cache._get_connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        assert count == 4
+
+    def test_get_does_not_write_until_flush(self, tmp_path):
+        cache = SQLiteCache(max_size=10, cache_dir=str(tmp_path), access_flush_interval=100)
+        cache.insert("key", "value")
+        conn = cache._get_connection()
+        seq_before = conn.execute("SELECT access_seq FROM cache WHERE key = 'key'").fetchone()[0]
+        assert cache.get("key") == "value"
+        assert conn.execute("SELECT access_seq FROM cache WHERE key = 'key'").fetchone()[0] == seq_before
+        cache.flush()
+        assert conn.execute("SELECT access_seq FROM cache WHERE key = 'key'").fetchone()[0] > seq_before
+
+    def test_eviction_is_lru(self, tmp_path):
+        cache = SQLiteCache(max_size=2, cache_dir=str(tmp_path), eviction_interval=1)
+        cache.insert("a", 1)
+        cache.insert("b", 2)
+        cache.get("a")
+        cache.insert("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_eviction_is_lru_across_instances(self, tmp_path):
+        # Instances in different processes share one recency sequence through the database
+        first = SQLiteCache(max_size=100, cache_dir=str(tmp_path), eviction_interval=1000)
+        second = SQLiteCache(max_size=100, cache_dir=str(tmp_path), eviction_interval=1)
+        for i in range(100):
+            first.insert(f"key{i}", i)
+        first.insert("key0", 0)
+        second.insert("newest", "value")
+
+        assert second.get("newest") == "value"
+        assert first.get("key1") is None
+        assert first.get("key0") == 0
+
+    def test_close_flushes_accesses(self, tmp_path):
+        cache = SQLiteCache(max_size=10, cache_dir=str(tmp_path), access_flush_interval=100)
+        cache.insert("a", 1)
+        cache.insert("b", 2)
+        cache.get("a")
+        cache.close()
+
+        reopened = SQLiteCache(max_size=10, cache_dir=str(tmp_path))
+        seqs = dict(reopened._get_connection().execute("SELECT key, access_seq FROM cache").fetchall())
+        assert seqs["a"] > seqs["b"]
+
+    def test_migrates_legacy_table(self, tmp_path):
+        conn = sqlite3.connect(str(tmp_path / "lotus_cache.db"))
+        conn.execute("CREATE TABLE cache (key TEXT PRIMARY KEY, value BLOB, last_accessed INTEGER)")
+        conn.execute("INSERT INTO cache VALUES (?, ?, ?)", ("old", pickle.dumps("value"), 100))
+        conn.commit()
+        conn.close()
+
+        cache = SQLiteCache(max_size=10, cache_dir=str(tmp_path))
+        assert cache.get("old") == "value"
+        cache.insert("new", "value")
+        seqs = dict(cache._get_connection().execute("SELECT key, access_seq FROM cache").fetchall())
+        assert seqs["new"] > seqs["old"] == 100
+        assert cache._get_connection().execute("SELECT version FROM cache WHERE key = 'old'").fetchone()[0] == 0
+
+    def test_concurrent_access(self, tmp_path):
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = SQLiteCache(max_size=1000, cache_dir=str(tmp_path), eviction_interval=8, access_flush_interval=8)
+
+        def worker(thread_id: int) -> None:
+            for i in range(50):
+                cache.insert(f"{thread_id}-{i}", i)
+                assert cache.get(f"{thread_id}-{i}") == i
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(worker, range(8)))
+
+        assert len(cache.get_many([f"{t}-{i}" for t in range(8) for i in range(50)])) == 400
+
+    def test_reset(self, sqlite_cache):
+        sqlite_cache.insert("key", "value")
+        sqlite_cache.reset(max_size=10)
+        assert sqlite_cache.get("key") is None
+        assert sqlite_cache.max_size == 10
+
+    def test_factory_passes_eviction_interval(self, tmp_path):
+        config = CacheConfig(CacheType.SQLITE, max_size=10, cache_dir=str(tmp_path), eviction_interval=5)
+        cache = CacheFactory.create_cache(config)
+        assert isinstance(cache, SQLiteCache)
+        assert cache.eviction_interval == 5
+
+
+class TestInMemoryCache(BaseTest):
+    def test_insert_and_get(self):
+        cache = InMemoryCache(max_size=2)
+        cache.insert("key", "value")
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+
+    def test_get_many(self):
+        cache = InMemoryCache(max_size=4)
+        cache.insert("a", 1)
+        cache.insert("b", 2)
+        assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+
+    def test_eviction_is_lru(self):
+        cache = InMemoryCache(max_size=2)
+        cache.insert("a", 1)
+        cache.insert("b", 2)
+        cache.get("a")
+        cache.insert("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestLMDBCache(BaseTest):
+    @pytest.fixture(autouse=True)
+    def require_lmdb(self):
+        pytest.importorskip("lmdb")
+
+    def test_insert_and_get(self, tmp_path):
+        cache = LMDBCache(max_size=4, cache_dir=str(tmp_path))
+        cache.insert("key", {"value": 1})
+        assert cache.get("key") == {"value": 1}
+        assert cache.get("missing") is None
+        assert cache.get_many(["key", "missing"]) == {"key": {"value": 1}}
+
+    def test_shared_across_instances(self, tmp_path):
+        writer = LMDBCache(max_size=4, cache_dir=str(tmp_path))
+        writer.insert("key", "value")
+        reader = LMDBCache(max_size=4, cache_dir=str(tmp_path))
+        assert reader.get("key") == "value"
+
+    def test_eviction_is_lru(self, tmp_path):
+        cache = LMDBCache(max_size=2, cache_dir=str(tmp_path), access_flush_interval=1)
+        cache.insert("a", 1)
+        cache.insert("b", 2)
+        cache.get("a")
+        cache.insert("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_reset(self, tmp_path):
+        cache = LMDBCache(max_size=2, cache_dir=str(tmp_path))
+        cache.insert("key", "value")
+        cache.reset(max_size=5)
+        assert cache.get("key") is None
+        assert cache.max_size == 5
+
+    def test_factory(self, tmp_path):
+        config = CacheConfig(CacheType.LMDB, max_size=10, cache_dir=str(tmp_path), map_size=2**20)
+        assert isinstance(CacheFactory.create_cache(config), LMDBCache)
+
+
+class _CountingAccessor:
+    def __init__(self, df: pd.DataFrame):
+        self._obj = df
+        self.calls = 0
+
+    @operator_cache
+    def __call__(self, instruction: str, **kwargs) -> pd.DataFrame:
+        self.calls += 1
+        return self._obj
+
+
+def _digest(value) -> str:
+    hasher = new_hasher()
+    _update_hash(hasher, value)
+    return hasher.hexdigest()
+
+
+class TestOperatorCache(BaseTest):
+    @pytest.fixture(autouse=True)
+    def configure_lm(self):
+        lotus.settings.configure(lm=LM(model="gpt-4o-mini"), enable_cache=True)
+        yield
+        lotus.settings.configure(lm=None, enable_cache=False)
+
+    def test_hit_on_identical_call(self):
+        accessor = _CountingAccessor(pd.DataFrame({"text": ["a", "b"]}))
+        accessor("summarize {text}", K=2)
+        accessor("summarize {text}", K=2)
+        assert accessor.calls == 1
+        assert lotus.settings.lm.stats.operator_cache_hits == 1
+
+    def test_miss_on_different_arguments(self):
+        accessor = _CountingAccessor(pd.DataFrame({"text": ["a", "b"]}))
+        accessor("summarize {text}", K=2)
+        accessor("summarize {text}", K=3)
+        _CountingAccessor(pd.DataFrame({"text": ["a", "c"]}))("summarize {text}", K=2)
+        assert lotus.settings.lm.stats.operator_cache_hits == 0
+
+    def test_hash_distinguishes_types(self):
+        assert _digest("1") != _digest(1)
+        assert _digest(["ab"]) != _digest(["a", "b"])
+        assert _digest({"a": None}) != _digest({"a": "None"})
+
+    def test_hash_dataframes(self):
+        df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+        assert _digest(df) == _digest(df.copy())
+        assert _digest(df) != _digest(df.rename(columns={"a": "c"}))
+        assert _digest(df) != _digest(df.astype({"a": float}))
+        assert _digest(df) != _digest(df.set_axis([1, 2]))
+        assert _digest(df) != _digest(df.iloc[:1])
+
+        unhashable = pd.DataFrame({"a": [[1], [2]]})
+        assert _digest(unhashable) == _digest(unhashable.copy())
+        assert _digest(unhashable) != _digest(pd.DataFrame({"a": [[1], [3]]}))
+
+        # Object columns would otherwise be hashed as their string forms
+        mixed = pd.DataFrame({"a": [1, "x"]})
+        assert _digest(mixed) == _digest(mixed.copy())
+        assert _digest(mixed) != _digest(pd.DataFrame({"a": ["1", "x"]}))
+        assert _digest(pd.DataFrame({"a": [b"x"]})) != _digest(pd.DataFrame({"a": ["x"]}))
+
+    def test_sha256_fallback_without_xxhash(self, monkeypatch):
+        monkeypatch.setattr("lotus.cache.xxhash_available", False)
+        assert new_hasher().name == "sha256"
+
+        accessor = _CountingAccessor(pd.DataFrame({"text": ["a", "b"]}))
+        accessor("summarize {text}")
+        accessor("summarize {text}")
+        assert accessor.calls == 1
@@ -10,11 +10,188 @@ from lotus.types import LotusUsageLimitException, UsageLimit
 from tests.base_test import BaseTest
 
 
+def _echo_batch_completion(model, batch, **kwargs):
+    """Stand-in for ``litellm.batch_completion`` that answers each prompt with its own content."""
+    from litellm.types.utils import ModelResponse, Usage
+
+    return [
+        ModelResponse(
+            model=model,
+            choices=[{"message": {"role": "assistant", "content": msgs[0]["content"]}, "index": 0}],
+            usage=Usage(prompt_tokens=5, completion_tokens=1, total_tokens=6),
+        )
+        for msgs in batch
+    ]
+
+
 class TestLM(BaseTest):
     def test_lm_initialization(self):
         lm = LM(model="gpt-4o-mini")
         assert isinstance(lm, LM)
 
+    def test_lm_hash_messages(self):
+        lm = LM(model="gpt-4o-mini")
+        messages = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Hi"}]
+        suffix = lm._serialize_kwargs({"temperature": 0.0})
+        key = lm._hash_messages(messages, suffix)
+
+        assert key == lm._hash_messages([dict(m) for m in messages], suffix)
+        assert key != lm._hash_messages(messages, lm._serialize_kwargs({"temperature": 0.5}))
+        assert key != lm._hash_messages([{"role": "user", "content": "Be brief."}, messages[1]], suffix)
+        assert key != lm._hash_messages([{"role": "system", "content": "Be brief.Hi"}], suffix)
+        # Content holding delimiter bytes can't pass for an extra field
+        assert lm._hash_messages([{"content": "x\x1fname\x1fy"}], suffix) != lm._hash_messages(
+            [{"content": "x", "name": "y"}], suffix
+        )
+        assert key != LM(model="gpt-4o")._hash_messages(messages, suffix)
+
+    def test_lm_cache_lookup_is_batched(self, monkeypatch):
+        from unittest.mock import patch
+
+        lm = LM(model="gpt-4o-mini")
+        monkeypatch.setattr(lotus.settings, "lm", lm)
+        monkeypatch.setattr(lotus.settings, "enable_cache", True)
+        messages = [[{"role": "user", "content": f"message {i}"}] for i in range(3)]
+
+        with patch("lotus.models.lm.batch_completion", side_effect=_echo_batch_completion) as mock_batch_completion:
+            lm(messages[:2], show_progress_bar=False)
+            with patch.object(lm.cache, "get", side_effect=AssertionError("get should not be called")):
+                output = lm(messages, show_progress_bar=False)
+
+        assert output.outputs == ["message 0", "message 1", "message 2"]
+        assert lm.stats.cache_hits == 2
+        assert len(mock_batch_completion.call_args_list[1][0][1]) == 1
+
+    def test_lm_deduplicates_identical_prompts(self, monkeypatch):
+        from unittest.mock import patch
+
+        lm = LM(model="gpt-4o-mini")
+        monkeypatch.setattr(lotus.settings, "lm", lm)
+        monkeypatch.setattr(lotus.settings, "enable_cache", True)
+        messages = [[{"role": "user", "content": content}] for content in ["a", "b", "a", "a"]]
+
+        with patch("lotus.models.lm.batch_completion", side_effect=_echo_batch_completion) as mock_batch_completion:
+            output = lm(messages, show_progress_bar=False)
+
+        assert output.outputs == ["a", "b", "a", "a"]
+        assert len(mock_batch_completion.call_args[0][1]) == 2
+        assert lm.stats.cache_hits == 2
+        assert lm.stats.physical_usage.total_tokens == 12
+        assert lm.stats.virtual_usage.total_tokens == 24
+
+    def test_lm_merge_responses(self):
+        lm = LM(model="gpt-4o-mini")
+        assert lm._merge_responses(["a", None, "c", None], ["b", "d"]) == ["a", "b", "c", "d"]
+        assert lm._merge_responses(["a", "b"], []) == ["a", "b"]
+        assert lm._merge_responses([None, None], ["a", "b"]) == ["a", "b"]
+
+    def test_lm_cache_disabled_skips_cache(self):
+        from unittest.mock import MagicMock, patch
+
+        from litellm.types.utils import ModelResponse
+
+        response = ModelResponse(choices=[{"message": {"role": "assistant", "content": "Paris"}, "index": 0}])
+        lm = LM(model="gpt-4o-mini", cache=MagicMock())
+        lotus.settings.configure(lm=lm, enable_cache=False)
+
+        with patch("lotus.models.lm.batch_completion", return_value=[response, response]):
+            output = lm([[{"role": "user", "content": "Capital of France?"}]] * 2, show_progress_bar=False)
+
+        assert output.outputs == ["Paris", "Paris"]
+        assert lm.cache.method_calls == []
+        assert lm.stats.cache_hits == 0
+
+    def test_lm_hidden_progress_bar_is_not_constructed(self):
+        from unittest.mock import patch
+
+        from litellm.types.utils import ModelResponse
+
+        response = ModelResponse(choices=[{"message": {"role": "assistant", "content": "Paris"}, "index": 0}])
+        lm = LM(model="gpt-4o-mini")
+        lotus.settings.configure(lm=lm, enable_cache=False)
+
+        with (
+            patch("lotus.models.lm.batch_completion", return_value=[response]),
+            patch("lotus.models.lm.tqdm") as mock_tqdm,
+        ):
+            lm([[{"role": "user", "content": "Capital of France?"}]], show_progress_bar=False)
+            assert lm._process_uncached_messages([], lm.kwargs, True, "") == []
+
+        mock_tqdm.assert_not_called()
+
+    def test_lm_format_logprobs_for_filter_cascade(self):
+        import math
+
+        from litellm.types.utils import ChatCompletionTokenLogprob, TopLogprob
+
+        def token_logprob(token: str, logprob: float, top: dict[str, float]) -> ChatCompletionTokenLogprob:
+            return ChatCompletionTokenLogprob(
+                token=token,
+                logprob=logprob,
+                bytes=None,
+                top_logprobs=[TopLogprob(token=t, logprob=lp, bytes=None) for t, lp in top.items()],
+            )
+
+        lm = LM(model="gpt-4o-mini")
+        logprobs = [
+            [token_logprob("True", math.log(0.6), {"True": math.log(0.6), "False": math.log(0.2)})],
+            [token_logprob("False", math.log(0.9), {"False": math.log(0.9)})],
+        ]
+        formatted = lm.format_logprobs_for_filter_cascade(logprobs)
+
+        assert formatted.tokens == [["True"], ["False"]]
+        assert formatted.confidences[0][0] == pytest.approx(0.6)
+        assert formatted.confidences[1][0] == pytest.approx(0.9)
+        assert formatted.true_probs[0] == pytest.approx(0.75)
+        assert formatted.true_probs[1] == 0
+
+    def test_lm_get_top_choice_logprobs_from_dicts(self):
+        from litellm.types.utils import ChatCompletionTokenLogprob, ModelResponse
+
+        response = ModelResponse(choices=[{"message": {"role": "assistant", "content": "True"}, "index": 0}])
+        response.choices[0].logprobs = {
+            "content": [{"token": "True", "logprob": -0.1, "bytes": None, "top_logprobs": []}]
+        }
+
+        logprobs = LM(model="gpt-4o-mini")._get_top_choice_logprobs(response)
+        assert isinstance(logprobs[0], ChatCompletionTokenLogprob)
+        assert logprobs[0].logprob == -0.1
+
+    def test_lm_cost_uses_cached_token_prices(self):
+        from unittest.mock import patch
+
+        from litellm import completion_cost
+        from litellm.types.utils import ModelResponse, Usage
+
+        lm = LM(model="gpt-4o-mini")
+        response = ModelResponse(
+            model="gpt-4o-mini",
+            choices=[{"message": {"role": "assistant", "content": "Paris"}, "index": 0}],
+            usage=Usage(prompt_tokens=500, completion_tokens=100, total_tokens=600),
+        )
+        expected_cost = completion_cost(completion_response=response)
+
+        with patch("lotus.models.lm.completion_cost") as mock_completion_cost:
+            lm._update_stats(response)
+            lm._update_stats(response)
+
+        mock_completion_cost.assert_not_called()
+        assert lm.stats.physical_usage.total_cost == pytest.approx(2 * expected_cost)
+
+        # Cache-creation tokens are billed at another rate, so the flat prices don't apply
+        lm = LM(model="claude-3-5-sonnet-20241022")
+        response = ModelResponse(
+            model="claude-3-5-sonnet-20241022",
+            choices=[{"message": {"role": "assistant", "content": "Paris"}, "index": 0}],
+            usage=Usage(prompt_tokens=2000, completion_tokens=100, total_tokens=2100, cache_creation_input_tokens=1800),
+        )
+        expected_cost = completion_cost(completion_response=response)
+        lm._update_stats(response)
+
+        flat_cost = 2000 * lm._get_token_prices()[0] + 100 * lm._get_token_prices()[1]
+        assert expected_cost > flat_cost
+        assert lm.stats.physical_usage.total_cost == pytest.approx(expected_cost)
+
     def test_lm_token_physical_usage_limit(self):
         # Test prompt token limit
         physical_usage_limit = UsageLimit(prompt_tokens_limit=100)
@@ -0,0 +1,427 @@
+import gc
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import lotus
+from lotus.models.rm import RM, show_progress_bars
+from lotus.sem_ops import _quant
+from lotus.sem_ops._emb_cache import get_or_compute
+from lotus.utils import get_index_dirs
+from lotus.vector_store import VS, FaissVS
+from tests.base_test import BaseTest
+
+
+class FakeRM(RM):
+    """Deterministic retrieval model that records every batch it is asked to embed."""
+
+    def __init__(self, dim: int = 8):
+        super().__init__()
+        self.dim = dim
+        self.calls: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def _embed(self, docs):
+        with self._lock:
+            self.calls.append(list(docs))
+        return np.stack([self.vector(doc) for doc in docs]).astype(np.float64)
+
+    def vector(self, doc) -> np.ndarray:
+        # Unit vectors, so under inner-product search every vector is its own nearest neighbor
+        rng = np.random.default_rng(zlib.crc32(str(doc).encode()))
+        vector = rng.standard_normal(self.dim)
+        return vector / np.linalg.norm(vector)
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+        self.collections: dict[str, np.ndarray] = {}
+
+
+class ClientVS(VS):
+    """Vector store that, like WeaviateVS, closes its client when it is collected."""
+
+    def __init__(self, client: FakeClient):
+        super().__init__()
+        self.client = client
+
+    def __del__(self):
+        self.client.closed = True
+
+    def index(self, docs, embeddings, index_dir, **kwargs):
+        assert not self.client.closed
+        self.client.collections[index_dir] = embeddings
+        self.index_dir = index_dir
+
+    def load_index(self, index_dir):
+        self.index_dir = index_dir
+
+    def get_vectors_from_index(self, index_dir, ids):
+        return self.client.collections[index_dir][ids]
+
+    def __call__(self, query_vectors, K, ids=None, **kwargs):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def fake_rm(monkeypatch):
+    rm = FakeRM()
+    monkeypatch.setattr(lotus.settings, "rm", rm)
+    monkeypatch.setattr(lotus.settings, "vs", FaissVS())
+    monkeypatch.setattr(lotus.settings, "enable_cache", False)
+    return rm
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({"title": [f"document {i}" for i in range(10)]})
+
+
+class TestSemIndex(BaseTest):
+    def test_embeds_in_batches(self, fake_rm, sample_df, tmp_path):
+        index_dir = str(tmp_path / "index")
+        df = sample_df.sem_index("title", index_dir, embed_batch_size=3, max_concurrency=4)
+
+        assert [len(batch) for batch in sorted(fake_rm.calls, key=lambda b: b[0])] == [3, 3, 3, 1]
+        assert df.attrs["index_dirs"]["title"] == index_dir
+
+        vecs = lotus.settings.vs.get_vectors_from_index(index_dir, list(range(10)))
+        expected = np.stack([fake_rm.vector(title) for title in sample_df["title"]])
+        assert vecs.dtype == np.float32
+        np.testing.assert_allclose(vecs, expected, rtol=1e-6)
+
+    def test_embeds_sequentially_under_one_progress_bar(self, fake_rm, monkeypatch, sample_df, tmp_path):
+        active = []
+        embed = fake_rm._embed
+
+        def record(docs):
+            active.append(show_progress_bars())
+            return embed(docs)
+
+        monkeypatch.setattr(fake_rm, "_embed", record)
+        sample_df.sem_index("title", str(tmp_path / "index"), embed_batch_size=3)
+
+        # Calls run one at a time by default, in order, and their own progress bars are hidden
+        assert fake_rm.calls == [sample_df["title"].tolist()[i : i + 3] for i in range(0, 10, 3)]
+        assert active == [False] * 4
+        assert show_progress_bars()
+
+    def test_embeds_distinct_values_once(self, fake_rm, tmp_path):
+        df = pd.DataFrame({"title": ["a", "b", "a", None, "b", "c"]})
+        index_dir = str(tmp_path / "index")
+        df.sem_index("title", index_dir)
+
+        assert sorted(doc for batch in fake_rm.calls for doc in batch) == ["a", "b", "c"]
+
+        vecs = lotus.settings.vs.get_vectors_from_index(index_dir, list(range(6)))
+        np.testing.assert_allclose(vecs[0], fake_rm.vector("a"))
+        np.testing.assert_allclose(vecs[2], fake_rm.vector("a"))
+        np.testing.assert_allclose(vecs[4], fake_rm.vector("b"))
+        np.testing.assert_allclose(vecs[3], np.zeros(fake_rm.dim))
+
+    def test_streams_row_batches_to_vector_store(self, fake_rm, tmp_path):
+        titles = ["a", "a", "b", None, "c", "b", "d", "e", "a"]
+        df = pd.DataFrame({"title": titles})
+        batches = []
+        index_batches = lotus.settings.vs.index_batches
+
+        def record_batches(row_batches, index_dir, **kwargs):
+            def recorded():
+                for docs, embeddings in row_batches:
+                    batches.append((list(docs), embeddings))
+                    yield docs, embeddings
+
+            return index_batches(recorded(), index_dir, **kwargs)
+
+        lotus.settings.vs.index_batches = record_batches
+        df.sem_index("title", str(tmp_path / "index"), embed_batch_size=2, max_concurrency=2)
+
+        # Each batch covers the rows whose values have all been embedded so far
+        assert [docs for docs, _ in batches] == [["a", "a", "b", None], ["c", "b", "d"], ["e", "a"]]
+        for docs, embeddings in batches:
+            for doc, embedding in zip(docs, embeddings):
+                expected = np.zeros(fake_rm.dim) if doc is None else fake_rm.vector(doc)
+                np.testing.assert_allclose(embedding, expected)
+
+    @pytest.mark.parametrize("dtype", ["string[pyarrow]", "large_string[pyarrow]"])
+    def test_arrow_backed_columns(self, fake_rm, tmp_path, dtype):
+        pytest.importorskip("pyarrow")
+        df = pd.DataFrame({"title": pd.Series(["a", "b", None, "a"], dtype=dtype)})
+        index_dir = str(tmp_path / "index")
+        df.sem_index("title", index_dir)
+
+        # The retrieval model gets plain Python strings, not pandas scalars
+        assert [type(doc) for batch in fake_rm.calls for doc in batch] == [str, str]
+        vecs = lotus.settings.vs.get_vectors_from_index(index_dir, [0, 2, 3])
+        np.testing.assert_allclose(vecs, np.stack([fake_rm.vector("a"), np.zeros(fake_rm.dim), fake_rm.vector("a")]))
+
+    def test_embedding_cache_reuses_embeddings(self, fake_rm, monkeypatch, tmp_path):
+        pytest.importorskip("lmdb")
+        monkeypatch.setattr(lotus.settings, "embedding_cache_dir", str(tmp_path / "cache"))
+
+        pd.DataFrame({"title": ["a", "b"]}).sem_index("title", str(tmp_path / "first"))
+        fake_rm.calls.clear()
+        pd.DataFrame({"title": ["b", "c", "a"]}).sem_index("title", str(tmp_path / "second"))
+
+        assert fake_rm.calls == [["c"]]
+        vecs = lotus.settings.vs.get_vectors_from_index(str(tmp_path / "second"), [0, 1, 2])
+        np.testing.assert_allclose(vecs, np.stack([fake_rm.vector(doc) for doc in ["b", "c", "a"]]))
+
+    def test_embedding_cache_stores_float32(self, fake_rm, tmp_path):
+        pytest.importorskip("lmdb")
+        cache_dir = str(tmp_path / "cache")
+        first = get_or_compute(["a", "b"], fake_rm, cache_dir)
+        fake_rm.calls.clear()
+        cached = get_or_compute(["b", "a"], fake_rm, cache_dir)
+
+        assert fake_rm.calls == []
+        assert first.dtype == cached.dtype == np.float32
+        np.testing.assert_array_equal(cached, first[::-1])
+
+    def test_embedding_cache_ignores_batch_size(self, fake_rm, tmp_path):
+        pytest.importorskip("lmdb")
+        fake_rm.max_batch_size = 64
+        get_or_compute(["a", "b"], fake_rm, str(tmp_path))
+        fake_rm.calls.clear()
+
+        fake_rm.max_batch_size = 8
+        get_or_compute(["a", "b"], fake_rm, str(tmp_path))
+        assert fake_rm.calls == []
+
+    def test_embedding_cache_without_lmdb(self, fake_rm, monkeypatch, tmp_path):
+        monkeypatch.setattr("lotus.cache.lmdb_available", False)
+        monkeypatch.setitem(sys.modules, "lmdb", None)
+        with pytest.raises(ImportError, match="pip install lotus-ai\\[lmdb\\]"):
+            get_or_compute(["a"], fake_rm, str(tmp_path))
+
+    def test_full_embedding_cache_does_not_fail_indexing(self, fake_rm, monkeypatch, tmp_path, caplog):
+        pytest.importorskip("lmdb")
+        monkeypatch.setattr(lotus.settings, "embedding_cache_dir", str(tmp_path / "cache"))
+        monkeypatch.setattr(lotus.settings, "embedding_cache_map_size", 16 * 1024)
+        df = pd.DataFrame({"title": [f"document {i}" for i in range(1000)]})
+        index_dir = str(tmp_path / "index")
+
+        df.sem_index("title", index_dir, embed_batch_size=1000)
+
+        assert "Embedding cache" in caplog.text
+        vecs = lotus.settings.vs.get_vectors_from_index(index_dir, [0, 999])
+        np.testing.assert_allclose(vecs, np.stack([fake_rm.vector(df["title"][i]) for i in [0, 999]]), rtol=1e-6)
+
+    def test_indexing_another_column_keeps_earlier_indexes(self, fake_rm, tmp_path):
+        df = pd.DataFrame({"title": ["a", "b"], "body": ["c", "d"]})
+        df.sem_index("title", str(tmp_path / "title"))
+        df.sem_index("body", str(tmp_path / "body"))
+        df.load_sem_index("other", str(tmp_path / "other"))
+
+        assert df.attrs["index_dirs"] == {
+            "title": str(tmp_path / "title"),
+            "body": str(tmp_path / "body"),
+            "other": str(tmp_path / "other"),
+        }
+
+    def test_index_dirs_are_shared_by_derived_frames(self, fake_rm, tmp_path):
+        df = pd.DataFrame({"title": ["a", "b"], "n": [1, 2]})
+        df.sem_index("title", str(tmp_path / "title"))
+
+        derived = df.copy().loc[df["n"] > 1]
+        # pandas deep-copies attrs, but the immutable mapping is shared rather than copied
+        assert get_index_dirs(derived) is get_index_dirs(df)
+        derived.load_sem_index("n", str(tmp_path / "n"))
+        assert dict(get_index_dirs(df)) == {"title": str(tmp_path / "title")}
+        assert pickle.loads(pickle.dumps(derived)).attrs["index_dirs"] == get_index_dirs(derived)
+        assert json.loads(json.dumps(derived.attrs)) == {"index_dirs": dict(get_index_dirs(derived))}
+
+    def test_indexed_frame_writes_to_parquet(self, fake_rm, tmp_path):
+        pytest.importorskip("pyarrow")
+        df = pd.DataFrame({"title": ["a", "b"]})
+        df.sem_index("title", str(tmp_path / "title"))
+        df.load_sem_index("other", str(tmp_path / "other"))
+
+        # pandas stores attrs in the parquet metadata as JSON
+        df.to_parquet(tmp_path / "df.parquet")
+        read = pd.read_parquet(tmp_path / "df.parquet")
+        assert dict(get_index_dirs(read)) == dict(get_index_dirs(df))
+
+    def test_index_many_embeds_columns_in_parallel(self, fake_rm, monkeypatch, tmp_path):
+        df = pd.DataFrame({"title": ["a", "b"], "body": ["c", "d"]})
+        # Both columns must be embedding at the same time to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        embed = fake_rm._embed
+        monkeypatch.setattr(fake_rm, "_embed", lambda docs: (barrier.wait(), embed(docs))[1])
+
+        df.sem_index.index_many([("title", str(tmp_path / "title")), ("body", str(tmp_path / "body"))], max_workers=2)
+
+        assert dict(get_index_dirs(df)) == {"title": str(tmp_path / "title"), "body": str(tmp_path / "body")}
+        for col_name in ["title", "body"]:
+            vecs = lotus.settings.vs.get_vectors_from_index(str(tmp_path / col_name), [0, 1])
+            np.testing.assert_allclose(vecs, np.stack([fake_rm.vector(doc) for doc in df[col_name]]), rtol=1e-6)
+            assert os.path.exists(tmp_path / col_name / "index")
+
+    def test_index_many_embeds_columns_one_at_a_time_by_default(self, fake_rm, monkeypatch, tmp_path):
+        df = pd.DataFrame({"title": ["a", "b"], "body": ["c", "d"], "tag": ["e", "f"]})
+        running = []
+        overlapped = threading.Event()
+        embed = fake_rm._embed
+
+        def record(docs):
+            running.append(docs)
+            if len(running) > 1:
+                overlapped.set()
+            time.sleep(0.05)
+            running.remove(docs)
+            return embed(docs)
+
+        monkeypatch.setattr(fake_rm, "_embed", record)
+        df.sem_index.index_many([(col, str(tmp_path / col)) for col in df.columns])
+
+        assert not overlapped.is_set()
+        assert fake_rm.calls == [["a", "b"], ["c", "d"], ["e", "f"]]
+
+    def test_index_many_rejects_shared_directories(self, fake_rm, tmp_path):
+        df = pd.DataFrame({"title": ["a"], "body": ["b"]})
+        with pytest.raises(ValueError, match="different directory"):
+            df.sem_index.index_many([("title", str(tmp_path)), ("body", str(tmp_path))])
+        assert fake_rm.calls == []
+
+    @pytest.mark.parametrize(
+        "df, message",
+        [
+            (pd.DataFrame({"title": [1, 2]}), "must contain text or images"),
+            (pd.DataFrame({"title": pd.Categorical([1, 2, 1])}), "must contain text or images"),
+            (pd.DataFrame({"title": [None, None]}), "has no values to index"),
+            (pd.DataFrame({"title": pd.Series([], dtype=object)}), "has no values to index"),
+            (pd.DataFrame({"body": ["a"]}), "not found in DataFrame"),
+        ],
+    )
+    def test_rejects_unindexable_columns(self, fake_rm, tmp_path, df, message):
+        with pytest.raises(ValueError, match=message):
+            df.sem_index("title", str(tmp_path / "index"))
+        assert fake_rm.calls == []
+
+    @pytest.mark.parametrize(
+        "titles",
+        [
+            pd.Categorical(["a", "b", None, "a"]),
+            pd.Series(["a", "b", None, "a"], dtype="string"),
+        ],
+    )
+    def test_accepts_text_columns(self, fake_rm, tmp_path, titles):
+        df = pd.DataFrame({"title": titles})
+        index_dir = str(tmp_path / "index")
+        df.sem_index("title", index_dir)
+
+        assert sorted(doc for batch in fake_rm.calls for doc in batch) == ["a", "b"]
+        vecs = lotus.settings.vs.get_vectors_from_index(index_dir, [0, 2, 3])
+        expected = np.stack([fake_rm.vector("a"), np.zeros(fake_rm.dim), fake_rm.vector("a")])
+        np.testing.assert_allclose(vecs, expected, rtol=1e-6)
+
+    @pytest.mark.parametrize("dtype, atol", [("fp16", 1e-2), ("int8", 5e-2)])
+    def test_reduced_precision_vectors(self, fake_rm, sample_df, tmp_path, dtype, atol):
+        index_dir = str(tmp_path / "index")
+        sample_df.sem_index("title", index_dir, embed_batch_size=4, dtype=dtype)
+
+        vecs = lotus.settings.vs.get_vectors_from_index(index_dir, [1, 3, 5])
+        expected = np.stack([fake_rm.vector(sample_df["title"][i]) for i in [1, 3, 5]])
+        np.testing.assert_allclose(vecs, expected, atol=atol)
+
+        # The FAISS index still searches the (dequantized) vectors
+        output = lotus.settings.vs(expected[:1].astype(np.float32), K=1)
+        assert output.indices[0][0] == 1
+
+    def test_deferred_build(self, fake_rm, sample_df, tmp_path):
+        index_dir = str(tmp_path / "index")
+        index_batches = lotus.settings.vs.index_batches
+
+        def slow_index_batches(*args, **kwargs):
+            time.sleep(0.2)
+            return index_batches(*args, **kwargs)
+
+        lotus.settings.vs.index_batches = slow_index_batches
+        df = sample_df.sem_index("title", index_dir, defer_build=True)
+        assert not os.path.exists(os.path.join(index_dir, "index"))
+
+        # Operators wait for the build of the index they read
+        result = df.sem_search("title", "document 3", K=1)
+        assert result["title"].tolist() == ["document 3"]
+
+    def test_deferred_build_keeps_client_of_store_open(self, fake_rm, monkeypatch, sample_df, tmp_path):
+        client = FakeClient()
+        vs = ClientVS(client)
+        monkeypatch.setattr(lotus.settings, "vs", vs)
+
+        df = sample_df.sem_index("title", str(tmp_path / "title"), defer_build=True)
+        df.sem_flush()
+        df.sem_index.index_many([("title", str(tmp_path / "other"))])
+        gc.collect()
+
+        assert not client.closed
+        assert set(client.collections) == {str(tmp_path / "title"), str(tmp_path / "other")}
+
+    def test_sem_flush_raises_build_errors(self, fake_rm, sample_df, tmp_path):
+        def failing_index_batches(batches, index_dir, **kwargs):
+            raise RuntimeError("build failed")
+
+        lotus.settings.vs.index_batches = failing_index_batches
+        df = sample_df.sem_index("title", str(tmp_path / "index"), defer_build=True)
+        with pytest.raises(RuntimeError, match="build failed"):
+            df.sem_flush()
+        # The failure is only reported once
+        df.sem_flush()
+
+    def test_vectors_of_loaded_index_are_read_from_memory(self, fake_rm, sample_df, tmp_path):
+        index_dir = str(tmp_path / "index")
+        sample_df.sem_index("title", index_dir)
+        vs = lotus.settings.vs
+        expected = vs.get_vectors_from_index(index_dir, [0, 4])
+
+        os.remove(os.path.join(index_dir, "vecs"))
+        np.testing.assert_array_equal(vs.get_vectors_from_index(index_dir, [0, 4]), expected)
+
+    def test_numba_quantization_matches_numpy(self, monkeypatch):
+        pytest.importorskip("numba")
+        embeddings = np.random.default_rng(0).standard_normal((50, 16)).astype(np.float32)
+        embeddings[3] = 0
+        quantized = _quant.quantize_int8(embeddings)
+
+        monkeypatch.setattr(_quant, "numba_available", False)
+        expected = _quant.quantize_int8(embeddings)
+        np.testing.assert_allclose(quantized.scales, expected.scales, rtol=1e-6)
+        assert np.abs(quantized.values.astype(np.int16) - expected.values).max() <= 1
+
+    def test_normalize(self, fake_rm, monkeypatch, tmp_path):
+        monkeypatch.setattr(fake_rm, "_embed", lambda docs: 3 * np.stack([fake_rm.vector(doc) for doc in docs]))
+        df = pd.DataFrame({"title": ["a", None, "b"]})
+        index_dir = str(tmp_path / "index")
+        df.sem_index("title", index_dir, normalize=True)
+
+        vecs = lotus.settings.vs.get_vectors_from_index(index_dir, [0, 1, 2])
+        np.testing.assert_allclose(np.linalg.norm(vecs, axis=1), [1, 0, 1], rtol=1e-6)
+        np.testing.assert_allclose(vecs[0], fake_rm.vector("a"), rtol=1e-5)
+
+    def test_skips_rebuilding_identical_index(self, fake_rm, sample_df, tmp_path):
+        index_dir = str(tmp_path / "index")
+        sample_df.sem_index("title", index_dir)
+        fake_rm.calls.clear()
+
+        df = sample_df.copy()
+        df.sem_index("title", index_dir)
+        assert fake_rm.calls == []
+        assert df.attrs["index_dirs"]["title"] == index_dir
+
+        df.sem_index("title", index_dir, dtype="fp16")
+        assert fake_rm.calls != []
+
+        fake_rm.calls.clear()
+        changed = sample_df.copy()
+        changed.loc[0, "title"] = "something else"
+        changed.sem_index("title", index_dir)
+        assert fake_rm.calls != []